@@ -64,10 +64,15 @@ class ProcessorFactory:
         return processor_class(queue_url, config)
     
     @classmethod
-    def get_all_processors(cls) -> Dict[str, BaseChannelProcessor]:
+    def get_all_processors(cls, raise_errors: bool = False) -> Dict[str, BaseChannelProcessor]:
         """
         Get all active processors from the database.
         
+        Args:
+            raise_errors: Re-raise when the ChannelProcessor query fails instead
+                of returning an empty dict, so callers can tell an outage apart
+                from having no active processors
+        
         Returns:
             Dict mapping channel types to processor instances
         """
@@ -90,6 +95,8 @@ class ProcessorFactory:
                     
         except Exception as e:
             logger.error(f"Error loading processor configurations: {e}")
+            if raise_errors:
+                raise
         
         return processors
     
@@ -317,20 +317,28 @@ class SMSProcessor(BaseChannelProcessor):
         Returns:
             str: The event type
         """
+        return self._event_type_for(event_data.get('MessageStatus'), event_data.get('Direction'))
+    
+    @staticmethod
+    def _event_type_for(status: Optional[str], direction: Optional[str]) -> str:
+        """
+        Map a Twilio (MessageStatus, Direction) pair to an event type.
+        
+        Malformed bodies may carry any JSON value here; anything unrecognised
+        falls through to the default.
+        """
         # Check for delivery status events
-        if 'MessageStatus' in event_data:
-            status = event_data['MessageStatus']
-            if status == 'delivered':
-                return 'delivery_status'
-            elif status == 'failed':
-                return 'error'
-            elif status == 'read':
-                return 'read_receipt'
+        if status == 'delivered':
+            return 'delivery_status'
+        elif status == 'failed':
+            return 'error'
+        elif status == 'read':
+            return 'read_receipt'
         
         # Check for message direction
-        if event_data.get('Direction') == 'inbound':
+        if direction == 'inbound':
             return 'message_received'
-        elif event_data.get('Direction') == 'outbound-api':
+        elif direction == 'outbound-api':
             return 'message_sent'
         
         # Default to message received for inbound messages
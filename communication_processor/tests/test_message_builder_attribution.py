@@ -1,9 +1,15 @@
 """SQS envelope optional crm_campaign_id / media_campaign_id fields."""
 from types import SimpleNamespace
+from unittest.mock import Mock
 
 from django.test import SimpleTestCase
 
-from communication_processor.utils.message_builder import SQSMessageBuilder, build_agent_message
+from communication_processor.utils.message_builder import (
+    LEAD_VALUE_FIELDS,
+    SQSBatcher,
+    SQSMessageBuilder,
+    build_agent_message,
+)
 
 
 class SQSMessageBuilderAttributionTests(SimpleTestCase):
@@ -62,3 +68,44 @@ class SQSMessageBuilderAttributionTests(SimpleTestCase):
         self.assertTrue(msg.get('agent_mode'))
         self.assertEqual(msg['crm_campaign_id'], 99)
         self.assertEqual(msg['media_campaign_id'], 100)
+
+    def test_build_sms_message_accepts_lead_values_dict(self):
+        lead = SimpleNamespace(
+            id=5, phone_number='+15550001111', email='a@example.com', first_name='A', last_name='B'
+        )
+        lead_values = {field: getattr(lead, field) for field in LEAD_VALUE_FIELDS}
+        from_instance = SQSMessageBuilder.build_sms_message(self._twilio, lead)
+        from_values = SQSMessageBuilder.build_sms_message(self._twilio, lead_values)
+        for key in ('lead_id', 'lead_phone_number', 'lead_email', 'lead_first_name', 'lead_last_name'):
+            self.assertEqual(from_values[key], from_instance[key])
+
+
+class SQSBatcherTests(SimpleTestCase):
+    def _client(self):
+        client = Mock()
+        client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            'Successful': [{'Id': entry['Id']} for entry in Entries]
+        }
+        return client
+
+    def test_sends_one_batch_per_threshold(self):
+        client = self._client()
+        batcher = SQSBatcher(client, 'queue-url', max_wait_seconds=60)
+        for i in range(10):
+            batcher.add({'n': i})
+        client.send_message_batch.assert_called_once()
+        entries = client.send_message_batch.call_args.kwargs['Entries']
+        self.assertEqual([e['Id'] for e in entries], [str(i) for i in range(10)])
+        self.assertEqual(SQSMessageBuilder.from_json(entries[3]['MessageBody']), {'n': 3})
+
+    def test_context_manager_flushes_remainder_and_records_failures(self):
+        client = self._client()
+        client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            'Successful': [{'Id': '0'}], 'Failed': [{'Id': '1', 'Code': 'x'}],
+        }
+        with SQSBatcher(client, 'queue-url', max_wait_seconds=60) as batcher:
+            batcher.add({'n': 0})
+            batcher.add({'n': 1})
+            client.send_message_batch.assert_not_called()
+        client.send_message_batch.assert_called_once()
+        self.assertEqual([e['Id'] for e in batcher.failed], ['1'])
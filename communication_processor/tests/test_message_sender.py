@@ -0,0 +1,17 @@
+"""MessageSender shared messaging client."""
+from django.test import SimpleTestCase, override_settings
+
+from communication_processor.utils.message_sender import MessageSender
+
+
+class MessageSenderClientTests(SimpleTestCase):
+    @override_settings(TWILIO_ACCOUNT_SID='AC_first', TWILIO_AUTH_TOKEN='token_first')
+    def test_client_is_shared_per_credentials(self):
+        client = MessageSender().client
+        self.assertIs(MessageSender().client, client)
+        self.assertEqual(client.username, 'AC_first')
+
+        with override_settings(TWILIO_ACCOUNT_SID='AC_second', TWILIO_AUTH_TOKEN='token_second'):
+            rotated = MessageSender().client
+        self.assertIsNot(rotated, client)
+        self.assertEqual((rotated.username, rotated.password), ('AC_second', 'token_second'))
@@ -0,0 +1,56 @@
+"""Worker processor caching and idle back-off."""
+from unittest.mock import Mock, patch, sentinel
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from communication_processor import worker
+from communication_processor.services.processor_factory import ProcessorFactory
+
+
+class ActiveProcessorCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache = patch.dict(worker._processor_cache, {'loaded_at': None, 'processors': {}})
+        cache.start()
+        self.addCleanup(cache.stop)
+
+    def test_failed_refresh_keeps_previous_processors(self):
+        with patch.object(worker.time, 'monotonic', return_value=1000.0), \
+                patch.object(ProcessorFactory, 'get_all_processors', return_value={'sms': sentinel.sms}):
+            self.assertEqual(worker._get_active_processors(), {'sms': sentinel.sms})
+
+        stale = 1000.0 + worker.PROCESSOR_REFRESH_SECONDS + 1
+        with patch.object(worker.time, 'monotonic', return_value=stale), \
+                patch('communication_processor.services.processor_factory.ChannelProcessor.objects') as objects:
+            objects.filter.side_effect = DatabaseError('connection refused')
+            self.assertEqual(worker._get_active_processors(), {'sms': sentinel.sms})
+
+        self.assertEqual(worker._processor_cache['loaded_at'], 1000.0)
+
+    def test_factory_swallows_query_errors_unless_asked(self):
+        with patch('communication_processor.services.processor_factory.ChannelProcessor.objects') as objects:
+            objects.filter.side_effect = DatabaseError('connection refused')
+            self.assertEqual(ProcessorFactory.get_all_processors(), {})
+            with self.assertRaises(DatabaseError):
+                ProcessorFactory.get_all_processors(raise_errors=True)
+
+
+class WorkerIdleBackoffTests(SimpleTestCase):
+    def test_failing_channel_still_backs_off(self):
+        processor = Mock()
+        processor.process_messages.side_effect = RuntimeError('receive failed')
+        # The second cycle ends the loop through the worker's KeyboardInterrupt handler
+        with patch.object(worker, '_get_active_processors', side_effect=[{'sms': processor}, KeyboardInterrupt]), \
+                patch.object(worker.time, 'sleep') as sleep:
+            worker.run_worker()
+
+        sleep.assert_called_once_with(worker.IDLE_SLEEP_SECONDS)
+
+    def test_single_channel_worker_backs_off_after_failures(self):
+        processor = Mock()
+        processor.process_messages.side_effect = [{'processed': 0, 'failed': 3, 'deleted': 0}, KeyboardInterrupt]
+        with patch.object(ProcessorFactory, 'get_processor', return_value=processor), \
+                patch.object(worker.time, 'sleep') as sleep:
+            worker.run_sms_worker()
+
+        sleep.assert_called_once_with(worker.IDLE_SLEEP_SECONDS)
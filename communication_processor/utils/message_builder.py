@@ -1,10 +1,71 @@
 import json
-from typing import Dict, Any, Optional
+import logging
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 from django.utils import timezone
 from external_models.models.external_references import Lead
 from external_models.models.nurturing_campaigns import LeadNurturingCampaign, LeadNurturingParticipant
 
 
+logger = logging.getLogger(__name__)
+
+
+# Lead columns read by the builders. Callers that only have a lead id can
+# pass Lead.objects.filter(id=...).values(*LEAD_VALUE_FIELDS).first()
+# instead of loading a Lead instance.
+LEAD_VALUE_FIELDS = ('id', 'phone_number', 'email', 'first_name', 'last_name')
+
+# Static defaults shared by every built message. Immutable sequences are
+# tuples (serialized as JSON arrays); dicts are copied before being attached.
+_DEFAULT_EXPECTED_KEYWORDS = ('YES', 'NO', 'STOP', 'HELP', 'INFO', 'START')
+
+_DEFAULT_PROCESSING_HINTS = {
+    'expected_keywords': _DEFAULT_EXPECTED_KEYWORDS,
+    'auto_response_enabled': True,
+    'require_lead_match': True,
+    'campaign_priority': 'normal',
+    'retry_on_failure': True,
+    'max_retries': 3,
+    'timeout_seconds': 30
+}
+
+_DEFAULT_METADATA_BASE = {
+    'source_campaign': 'sms_webhook',
+    'utm_source': 'sms_campaign',
+    'utm_medium': 'sms',
+    'utm_content': 'webhook_response',
+    'utm_term': 'sms',
+    'referrer': 'twilio_webhook',
+}
+
+_DEFAULT_AGENT_GOALS = (
+    'Provide helpful information',
+    'Answer customer questions',
+    'Guide customers through the process'
+)
+
+_DEFAULT_AGENT_CONFIG = {
+    'enabled': True,
+    'model': 'gpt-4',  # or your preferred model
+    'temperature': 0.7,
+    'max_tokens': 150,
+    'fallback_response': "Thanks for your message! I'm here to help. Please let me know if you have any questions."
+}
+
+_DEFAULT_AGENT_CONTEXT = {
+    'campaign_goals': _DEFAULT_AGENT_GOALS,
+    'response_style': 'friendly and professional',
+    'include_opt_out_info': True
+}
+
+
 class SQSMessageBuilder:
     """
     Utility class for building enhanced SQS messages with additional context.
@@ -29,7 +90,7 @@ class SQSMessageBuilder:
         
         Args:
             twilio_data: Raw Twilio webhook data
-            lead: Lead object (optional)
+            lead: Lead object, or a dict of its LEAD_VALUE_FIELDS (optional)
             nurturing_campaign: Nurturing campaign object (optional)
             campaign_participant: Campaign participant object (optional)
             message_context: Additional message context (optional)
@@ -41,6 +102,8 @@ class SQSMessageBuilder:
         Returns:
             Enhanced SQS message dictionary
         """
+        now_iso = timezone.now().isoformat()
+        
         # Base message structure
         message = {
             # Twilio fields (normalized to lowercase)
@@ -62,7 +125,7 @@ class SQSMessageBuilder:
             
             # Timestamps
             'timestamps': {
-                'webhook_received': timezone.now().isoformat(),
+                'webhook_received': now_iso,
                 'message_sent': twilio_data.get('DateCreated'),
                 'message_delivered': twilio_data.get('DateUpdated'),
             }
@@ -70,16 +133,25 @@ class SQSMessageBuilder:
         
         # Add lead information
         if lead:
-            message.update({
-                'lead_id': lead.id,
-                'lead_phone_number': lead.phone_number,
-                'lead_email': lead.email,
-                'lead_first_name': lead.first_name,
-                'lead_last_name': lead.last_name,
-            })
+            if isinstance(lead, dict):
+                # Lead row from .values(*LEAD_VALUE_FIELDS); no model access
+                message['lead_id'] = lead['id']
+                message['lead_phone_number'] = lead['phone_number']
+                message['lead_email'] = lead['email']
+                message['lead_first_name'] = lead['first_name']
+                message['lead_last_name'] = lead['last_name']
+            else:
+                message['lead_id'] = lead.id
+                message['lead_phone_number'] = lead.phone_number
+                message['lead_email'] = lead.email
+                message['lead_first_name'] = lead.first_name
+                message['lead_last_name'] = lead.last_name
         
         # Add campaign information
+        campaign_name = campaign_type = None
         if nurturing_campaign:
+            campaign_name = nurturing_campaign.name
+            campaign_type = nurturing_campaign.campaign_type
             message['nurturing_campaign_id'] = nurturing_campaign.id
             
             # Add campaign participant if provided
@@ -97,12 +169,12 @@ class SQSMessageBuilder:
         elif nurturing_campaign:
             # Generate default message context from campaign
             message['message_context'] = {
-                'campaign_name': nurturing_campaign.name,
-                'campaign_type': nurturing_campaign.campaign_type,
+                'campaign_name': campaign_name,
+                'campaign_type': campaign_type,
                 'step_number': 1,  # This should be determined by your logic
                 'triggered_by': 'webhook',
                 'original_message_id': twilio_data.get('MessageSid'),
-                'scheduled_send_time': timezone.now().isoformat(),
+                'scheduled_send_time': now_iso,
             }
         
         # Add metadata
@@ -110,30 +182,16 @@ class SQSMessageBuilder:
             message['metadata'] = metadata
         else:
             # Generate default metadata
-            message['metadata'] = {
-                'source_campaign': 'sms_webhook',
-                'utm_source': 'sms_campaign',
-                'utm_medium': 'sms',
-                'utm_campaign': nurturing_campaign.name if nurturing_campaign else 'unknown',
-                'utm_content': 'webhook_response',
-                'utm_term': 'sms',
-                'referrer': 'twilio_webhook',
-            }
+            default_metadata = _DEFAULT_METADATA_BASE.copy()
+            default_metadata['utm_campaign'] = campaign_name if nurturing_campaign else 'unknown'
+            message['metadata'] = default_metadata
         
         # Add processing hints
         if processing_hints:
             message['processing_hints'] = processing_hints
         else:
             # Generate default processing hints
-            message['processing_hints'] = {
-                'expected_keywords': ['YES', 'NO', 'STOP', 'HELP', 'INFO', 'START'],
-                'auto_response_enabled': True,
-                'require_lead_match': True,
-                'campaign_priority': 'normal',
-                'retry_on_failure': True,
-                'max_retries': 3,
-                'timeout_seconds': 30
-            }
+            message['processing_hints'] = _DEFAULT_PROCESSING_HINTS.copy()
         
         # Add agent mode configuration
         if agent_mode:
@@ -143,27 +201,16 @@ class SQSMessageBuilder:
                 message['agent_config'] = agent_config
             else:
                 # Generate default agent configuration
-                message['agent_config'] = {
-                    'enabled': True,
-                    'model': 'gpt-4',  # or your preferred model
-                    'temperature': 0.7,
-                    'max_tokens': 150,
-                    'prompt': f"You are a helpful AI assistant for {nurturing_campaign.name if nurturing_campaign else 'our company'}. Respond naturally and helpfully to customer inquiries.",
-                    'context': {
-                        'campaign_name': nurturing_campaign.name if nurturing_campaign else 'General',
-                        'campaign_type': nurturing_campaign.campaign_type if nurturing_campaign else 'general',
-                        'step_number': message_context.get('step_number', 1) if message_context else 1,
-                        'conversation_history': [],
-                        'campaign_goals': [
-                            'Provide helpful information',
-                            'Answer customer questions',
-                            'Guide customers through the process'
-                        ],
-                        'response_style': 'friendly and professional',
-                        'include_opt_out_info': True
-                    },
-                    'fallback_response': "Thanks for your message! I'm here to help. Please let me know if you have any questions."
-                }
+                agent_context = _DEFAULT_AGENT_CONTEXT.copy()
+                agent_context['campaign_name'] = campaign_name if nurturing_campaign else 'General'
+                agent_context['campaign_type'] = campaign_type if nurturing_campaign else 'general'
+                agent_context['step_number'] = message_context.get('step_number', 1) if message_context else 1
+                agent_context['conversation_history'] = []
+                
+                default_agent_config = _DEFAULT_AGENT_CONFIG.copy()
+                default_agent_config['prompt'] = f"You are a helpful AI assistant for {campaign_name if nurturing_campaign else 'our company'}. Respond naturally and helpfully to customer inquiries."
+                default_agent_config['context'] = agent_context
+                message['agent_config'] = default_agent_config
         
         return message
 
@@ -193,8 +240,14 @@ class SQSMessageBuilder:
 
         message['agent_mode'] = True
 
+        if nurturing_campaign:
+            campaign_name = nurturing_campaign.name
+            campaign_type = nurturing_campaign.campaign_type
+        else:
+            campaign_name, campaign_type = 'General', 'general'
+
         custom_prompt = agent_prompt or (
-            f"You are a helpful AI assistant for {nurturing_campaign.name if nurturing_campaign else 'our company'}. "
+            f"You are a helpful AI assistant for {campaign_name if nurturing_campaign else 'our company'}. "
             "Respond naturally and helpfully to customer inquiries."
         )
 
@@ -205,9 +258,9 @@ class SQSMessageBuilder:
             'max_tokens': 150,
             'prompt': custom_prompt,
             'context': {
-                'campaign_name': nurturing_campaign.name if nurturing_campaign else 'General',
-                'campaign_type': nurturing_campaign.campaign_type if nurturing_campaign else 'general',
-                'step_number': message.get('message_context', {}).get('step_number', 1),
+                'campaign_name': campaign_name,
+                'campaign_type': campaign_type,
+                'step_number': (message.get('message_context') or {}).get('step_number', 1),
                 'conversation_history': conversation_history or [],
                 'campaign_goals': [
                     'Provide helpful information',
@@ -274,13 +327,11 @@ class SQSMessageBuilder:
         message['event_type'] = 'sms.delivery_status'
         
         # Add delivery-specific information
-        message.update({
-            'delivery_status': twilio_data.get('MessageStatus'),
-            'error_code': twilio_data.get('ErrorCode'),
-            'error_message': twilio_data.get('ErrorMessage'),
-            'price': twilio_data.get('Price'),
-            'price_unit': twilio_data.get('PriceUnit'),
-        })
+        message['delivery_status'] = twilio_data.get('MessageStatus')
+        message['error_code'] = twilio_data.get('ErrorCode')
+        message['error_message'] = twilio_data.get('ErrorMessage')
+        message['price'] = twilio_data.get('Price')
+        message['price_unit'] = twilio_data.get('PriceUnit')
         
         return message
     
@@ -332,19 +383,17 @@ class SQSMessageBuilder:
         message['event_type'] = 'sms.opt_out'
         
         # Add opt-out specific information
-        message.update({
-            'opt_out_keyword': keyword,
-            'opt_out_type': 'campaign' if nurturing_campaign else 'global',
-            'processing_hints': {
-                'expected_keywords': [keyword],
-                'auto_response_enabled': True,
-                'require_lead_match': True,
-                'campaign_priority': 'high',
-                'retry_on_failure': False,
-                'max_retries': 1,
-                'timeout_seconds': 10
-            }
-        })
+        message['opt_out_keyword'] = keyword
+        message['opt_out_type'] = 'campaign' if nurturing_campaign else 'global'
+        message['processing_hints'] = {
+            'expected_keywords': [keyword],
+            'auto_response_enabled': True,
+            'require_lead_match': True,
+            'campaign_priority': 'high',
+            'retry_on_failure': False,
+            'max_retries': 1,
+            'timeout_seconds': 10
+        }
         
         return message
     
@@ -359,6 +408,14 @@ class SQSMessageBuilder:
         Returns:
             JSON string representation
         """
+        if orjson is not None:
+            # Datetimes pass through to ``default`` so they serialize exactly
+            # as the json fallback does.
+            return orjson.dumps(
+                message,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            ).decode()
         return json.dumps(message, default=str)
     
     @staticmethod
@@ -372,6 +429,8 @@ class SQSMessageBuilder:
         Returns:
             Message dictionary
         """
+        if orjson is not None:
+            return orjson.loads(json_string)
         return json.loads(json_string)
 
 
@@ -388,7 +447,7 @@ def build_inbound_sms_message(
     
     Args:
         twilio_data: Raw Twilio webhook data
-        lead: Lead object (optional)
+        lead: Lead object, or a dict of its LEAD_VALUE_FIELDS (optional)
         nurturing_campaign: Nurturing campaign object (optional)
         
     Returns:
@@ -396,11 +455,13 @@ def build_inbound_sms_message(
     """
     campaign_participant = None
     if lead and nurturing_campaign:
+        # Only the participant id is used in the message; the lookup is
+        # covered by the (lead, nurturing_campaign, status) unique index
         campaign_participant = LeadNurturingParticipant.objects.filter(
-            lead=lead,
-            nurturing_campaign=nurturing_campaign,
+            lead_id=lead['id'] if isinstance(lead, dict) else lead.id,
+            nurturing_campaign_id=nurturing_campaign.id,
             status='active'
-        ).first()
+        ).only('id').first()
     
     return SQSMessageBuilder.build_sms_message(
         twilio_data,
@@ -412,6 +473,36 @@ def build_inbound_sms_message(
     )
 
 
+@lru_cache(maxsize=512)
+def _campaign_utm_template(campaign_id, campaign_name, campaign_type, step_number):
+    """Read-only UTM metadata for a campaign step; callers copy before use."""
+    slug = campaign_name.lower().replace(' ', '_')
+    return MappingProxyType({
+        'source_campaign': slug,
+        'utm_source': 'sms_campaign',
+        'utm_medium': 'sms',
+        'utm_campaign': slug,
+        'utm_content': f'step_{step_number}',
+        'utm_term': campaign_type,
+        'referrer': 'sms_response',
+        'landing_page': f'https://example.com/campaign/{campaign_id}'
+    })
+
+
+@lru_cache(maxsize=512)
+def _campaign_context_template(campaign_id, campaign_name, campaign_type, step_number):
+    """Read-only per-step message_context; callers add the per-message fields."""
+    return MappingProxyType({
+        'campaign_name': campaign_name,
+        'campaign_type': campaign_type,
+        'step_number': step_number,
+        'triggered_by': 'user_response',
+        'original_message_id': None,
+        'scheduled_send_time': None,
+        'message_template_id': f'{campaign_type}_step_{step_number}'
+    })
+
+
 def build_campaign_response_message(
     twilio_data: Dict[str, Any],
     lead: Lead,
@@ -434,26 +525,16 @@ def build_campaign_response_message(
     Returns:
         Enhanced SQS message dictionary
     """
-    message_context = {
-        'campaign_name': nurturing_campaign.name,
-        'campaign_type': nurturing_campaign.campaign_type,
-        'step_number': step_number,
-        'triggered_by': 'user_response',
-        'original_message_id': twilio_data.get('MessageSid'),
-        'scheduled_send_time': timezone.now().isoformat(),
-        'message_template_id': f'{nurturing_campaign.campaign_type}_step_{step_number}'
-    }
-    
-    metadata = {
-        'source_campaign': f'{nurturing_campaign.name.lower().replace(" ", "_")}',
-        'utm_source': 'sms_campaign',
-        'utm_medium': 'sms',
-        'utm_campaign': nurturing_campaign.name.lower().replace(' ', '_'),
-        'utm_content': f'step_{step_number}',
-        'utm_term': nurturing_campaign.campaign_type,
-        'referrer': 'sms_response',
-        'landing_page': f'https://example.com/campaign/{nurturing_campaign.id}'
-    }
+    template_key = (
+        nurturing_campaign.id,
+        nurturing_campaign.name,
+        nurturing_campaign.campaign_type,
+        step_number,
+    )
+    message_context = dict(_campaign_context_template(*template_key))
+    message_context['original_message_id'] = twilio_data.get('MessageSid')
+    message_context['scheduled_send_time'] = timezone.now().isoformat()
+    metadata = dict(_campaign_utm_template(*template_key))
     
     return SQSMessageBuilder.build_sms_message(
         twilio_data,
@@ -489,4 +570,74 @@ def build_agent_message(
         conversation_history=conversation_history,
         crm_campaign=crm_campaign,
         media_campaign=media_campaign,
-    )
\ No newline at end of file
+    )
+
+
+class SQSBatcher:
+    """
+    Accumulates built messages and sends them with ``send_message_batch``.
+
+    A batch is sent once ``flush_threshold`` messages are pending (SQS accepts
+    at most 10 per call) or when a message is added after ``max_wait_seconds``
+    have passed since the oldest pending one. Call :meth:`flush` (or use the
+    batcher as a context manager) to send whatever is left.
+    """
+
+    MAX_BATCH_SIZE = 10
+
+    def __init__(self, sqs_client, queue_url: str, flush_threshold: int = MAX_BATCH_SIZE,
+                 max_wait_seconds: float = 1.0):
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+        self.flush_threshold = max(1, min(flush_threshold, self.MAX_BATCH_SIZE))
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[str] = []
+        self._oldest_pending_at = None
+        self.failed: List[Dict[str, Any]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def add(self, message: Dict[str, Any]) -> None:
+        """
+        Queue a message, sending the batch if it is full or has waited too long.
+
+        Args:
+            message: The message dictionary built by SQSMessageBuilder
+        """
+        if not self._pending:
+            self._oldest_pending_at = time.monotonic()
+        self._pending.append(SQSMessageBuilder.to_json(message))
+        if (len(self._pending) >= self.flush_threshold
+                or time.monotonic() - self._oldest_pending_at >= self.max_wait_seconds):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Send all pending messages.
+
+        Returns:
+            Number of messages SQS accepted
+        """
+        sent = 0
+        while self._pending:
+            bodies = self._pending[:self.MAX_BATCH_SIZE]
+            del self._pending[:self.MAX_BATCH_SIZE]
+            entries = [{'Id': str(i), 'MessageBody': body} for i, body in enumerate(bodies)]
+            try:
+                response = self.sqs_client.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+            except Exception as e:
+                logger.error("Error sending SQS message batch of %d: %s", len(entries), e)
+                self.failed.extend(entries)
+                continue
+            failed = response.get('Failed', [])
+            if failed:
+                by_id = {entry['Id']: entry for entry in entries}
+                self.failed.extend(by_id[f['Id']] for f in failed if f.get('Id') in by_id)
+                logger.error("SQS rejected %d of %d batched messages", len(failed), len(entries))
+            sent += len(response.get('Successful', []))
+        self._oldest_pending_at = None
+        return sent
@@ -1,9 +1,52 @@
 import logging
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Connection pool size for the shared Twilio HTTP session
+TWILIO_POOL_SIZE = 32
+
+# Static response bodies; campaign-specific variants are formatted on demand
+_OPT_OUT_BODY = "You have been unsubscribed from this campaign. You will no longer receive messages."
+_OPT_OUT_CAMPAIGN_BODY = "You have been unsubscribed from '{}'. You will no longer receive messages."
+_HELP_BODY = (
+    "Reply STOP to opt out of messages. "
+    "Reply HELP for this message. "
+    "Reply INFO for more information."
+)
+_INFO_BODY = "You're receiving messages from our automated system. Reply STOP to opt out."
+_INFO_CAMPAIGN_BODY = _INFO_BODY + " Current campaign: {}"
+_OPT_IN_BODY = "You have been successfully subscribed to our messages."
+_OPT_IN_CAMPAIGN_BODY = "You have been successfully subscribed to '{}'."
+
+
+@lru_cache(maxsize=4)
+def _get_shared_client(platform: str, account_sid: Optional[str] = None, auth_token: Optional[str] = None):
+    """
+    Build the messaging client for a platform once per set of credentials.
+    
+    Every MessageSender reuses the same client, so sends share one pooled
+    HTTP session (and its keep-alive connections) instead of opening a new
+    one per sender. The credentials are part of the cache key, so rotated
+    or overridden settings get a fresh client.
+    """
+    if platform == 'twilio':
+        try:
+            from requests.adapters import HTTPAdapter
+            from twilio.http.http_client import TwilioHttpClient
+            from twilio.rest import Client
+        except ImportError:
+            logger.error("Twilio client not available")
+            return None
+        
+        http_client = TwilioHttpClient()
+        adapter = HTTPAdapter(pool_connections=TWILIO_POOL_SIZE, pool_maxsize=TWILIO_POOL_SIZE)
+        http_client.session.mount('https://', adapter)
+        return Client(account_sid, auth_token, http_client=http_client)
+    return None
+
 
 class MessageSender:
     """
@@ -16,18 +59,10 @@ class MessageSender:
         self.client = self._get_client()
     
     def _get_client(self):
-        """Get the appropriate client for the messaging platform."""
+        """Get the shared client for the messaging platform."""
         if self.platform == 'twilio':
-            try:
-                from twilio.rest import Client
-                return Client(
-                    settings.TWILIO_ACCOUNT_SID,
-                    settings.TWILIO_AUTH_TOKEN
-                )
-            except ImportError:
-                logger.error("Twilio client not available")
-                return None
-        return None
+            return _get_shared_client(self.platform, settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        return _get_shared_client(self.platform)
     
     def send_sms(self, to_number: str, message: str, from_number: Optional[str] = None) -> bool:
         """
@@ -77,10 +112,7 @@ class MessageSender:
         Returns:
             bool: True if sent successfully, False otherwise
         """
-        message = "You have been unsubscribed from this campaign. You will no longer receive messages."
-        if campaign_name:
-            message = f"You have been unsubscribed from '{campaign_name}'. You will no longer receive messages."
-        
+        message = _OPT_OUT_CAMPAIGN_BODY.format(campaign_name) if campaign_name else _OPT_OUT_BODY
         return self.send_sms(to_number, message, from_number)
     
     def send_help_message(self, to_number: str, from_number: Optional[str] = None) -> bool:
@@ -94,13 +126,7 @@ class MessageSender:
         Returns:
             bool: True if sent successfully, False otherwise
         """
-        message = (
-            "Reply STOP to opt out of messages. "
-            "Reply HELP for this message. "
-            "Reply INFO for more information."
-        )
-        
-        return self.send_sms(to_number, message, from_number)
+        return self.send_sms(to_number, _HELP_BODY, from_number)
     
     def send_info_message(self, to_number: str, campaign_name: Optional[str] = None, from_number: Optional[str] = None) -> bool:
         """
@@ -114,10 +140,7 @@ class MessageSender:
         Returns:
             bool: True if sent successfully, False otherwise
         """
-        message = "You're receiving messages from our automated system. Reply STOP to opt out."
-        if campaign_name:
-            message += f" Current campaign: {campaign_name}"
-        
+        message = _INFO_CAMPAIGN_BODY.format(campaign_name) if campaign_name else _INFO_BODY
         return self.send_sms(to_number, message, from_number)
     
     def send_opt_in_confirmation(self, to_number: str, campaign_name: Optional[str] = None, from_number: Optional[str] = None) -> bool:
@@ -132,8 +155,5 @@ class MessageSender:
         Returns:
             bool: True if sent successfully, False otherwise
         """
-        message = "You have been successfully subscribed to our messages."
-        if campaign_name:
-            message = f"You have been successfully subscribed to '{campaign_name}'."
-        
+        message = _OPT_IN_CAMPAIGN_BODY.format(campaign_name) if campaign_name else _OPT_IN_BODY
         return self.send_sms(to_number, message, from_number) 
\ No newline at end of file
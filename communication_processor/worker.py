@@ -11,6 +11,7 @@ import sys
 import time
 import logging
 import django
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any
 
 # Add the current working directory to Python path so Django can find the acs_personalization module
@@ -24,6 +25,7 @@ django.setup()
 
 from communication_processor.services.processor_factory import ProcessorFactory
 from communication_processor.models import ChannelProcessor
+from django.db import connection
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +34,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# receive_messages long-polls SQS (WaitTimeSeconds=20), so a full queue is
+# drained back to back; this short back-off only applies after a cycle
+# that processed nothing, e.g. when receiving failed and returned at once.
+IDLE_SLEEP_SECONDS = 5
+
+# How long the set of active processors is reused before re-reading the
+# ChannelProcessor table
+PROCESSOR_REFRESH_SECONDS = 60
+
+_processor_cache = {
+    'loaded_at': None,
+    'processors': {},
+}
+
+
+def _get_active_processors() -> Dict[str, Any]:
+    """
+    Get the active processors, reloading them at most once per refresh window.
+    
+    If the ChannelProcessor query fails, the last successfully loaded
+    processors are kept and the reload is retried on the next call.
+    """
+    now = time.monotonic()
+    loaded_at = _processor_cache['loaded_at']
+    
+    if loaded_at is None or now - loaded_at > PROCESSOR_REFRESH_SECONDS:
+        try:
+            _processor_cache['processors'] = ProcessorFactory.get_all_processors(raise_errors=True)
+            _processor_cache['loaded_at'] = now
+        except Exception as e:
+            logger.error("Failed to refresh processors, keeping previous set: %s", e)
+    
+    return _processor_cache['processors']
+
+
+def _process_channel(channel_type: str, processor) -> Dict[str, int]:
+    """
+    Process one batch for a channel on a worker thread.
+    
+    Each thread gets its own database connection, which is closed when the
+    batch is done so short-lived pool threads don't leak connections.
+    """
+    try:
+        logger.info("Processing messages for %s channel", channel_type)
+        return processor.process_messages(max_messages=10)
+    finally:
+        connection.close()
+
 
 def run_worker():
     """
@@ -41,8 +91,8 @@ def run_worker():
     
     while True:
         try:
-            # Get all active processors from the database
-            processors = ProcessorFactory.get_all_processors()
+            # Get all active processors (cached between database reloads)
+            processors = _get_active_processors()
             
             if not processors:
                 logger.warning("No active processors found. Waiting 30 seconds before retry...")
@@ -53,33 +103,47 @@ def run_worker():
             total_processed = 0
             total_failed = 0
             
-            for channel_type, processor in processors.items():
-                try:
-                    logger.info(f"Processing messages for {channel_type} channel")
-                    stats = processor.process_messages(max_messages=10)
-                    
-                    total_processed += stats['processed']
-                    total_failed += stats['failed']
-                    
-                    if stats['processed'] > 0 or stats['failed'] > 0:
-                        logger.info(f"{channel_type}: Processed {stats['processed']}, Failed {stats['failed']}, Deleted {stats['deleted']}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing {channel_type} messages: {e}")
-                    total_failed += 1
+            # Poll every channel concurrently: each SQS long poll is I/O bound,
+            # so a cycle takes as long as the slowest channel, not the sum
+            with ThreadPoolExecutor(max_workers=len(processors)) as executor:
+                futures = {
+                    executor.submit(_process_channel, channel_type, processor): channel_type
+                    for channel_type, processor in processors.items()
+                }
+                
+                for future in as_completed(futures):
+                    channel_type = futures[future]
+                    try:
+                        stats = future.result()
+                        
+                        total_processed += stats['processed']
+                        total_failed += stats['failed']
+                        
+                        if stats['processed'] > 0 or stats['failed'] > 0:
+                            logger.info(
+                                "%s: Processed %d, Failed %d, Deleted %d",
+                                channel_type, stats['processed'], stats['failed'], stats['deleted'],
+                            )
+                        
+                    except Exception as e:
+                        logger.error("Error processing %s messages: %s", channel_type, e)
+                        total_failed += 1
             
             # Log summary
             if total_processed > 0 or total_failed > 0:
-                logger.info(f"Worker cycle complete: Total processed {total_processed}, Total failed {total_failed}")
+                logger.info("Worker cycle complete: Total processed %d, Total failed %d", total_processed, total_failed)
             
-            # Sleep to avoid tight loop
-            time.sleep(5)
+            # Back off unless messages were processed: long polling already
+            # waits on empty queues, and a channel that fails immediately
+            # must not spin the loop
+            if total_processed == 0:
+                time.sleep(IDLE_SLEEP_SECONDS)
             
         except KeyboardInterrupt:
             logger.info("Worker stopped by user")
             break
         except Exception as e:
-            logger.error(f"Unexpected error in worker loop: {e}")
+            logger.error("Unexpected error in worker loop: %s", e)
             time.sleep(30)  # Wait longer on unexpected errors
 
 
@@ -102,18 +166,22 @@ def run_sms_worker():
         while True:
             try:
                 stats = processor.process_messages(max_messages=10)
-                logger.info(f"SMS: Processed {stats['processed']}, Failed {stats['failed']}, Deleted {stats['deleted']}")
-                time.sleep(5)
+                logger.info(
+                    "SMS: Processed %d, Failed %d, Deleted %d",
+                    stats['processed'], stats['failed'], stats['deleted'],
+                )
+                if stats['processed'] == 0:
+                    time.sleep(IDLE_SLEEP_SECONDS)
                 
             except KeyboardInterrupt:
                 logger.info("SMS Worker stopped by user")
                 break
             except Exception as e:
-                logger.error(f"Error in SMS worker: {e}")
+                logger.error("Error in SMS worker: %s", e)
                 time.sleep(30)
                 
     except Exception as e:
-        logger.error(f"Failed to initialize SMS worker: {e}")
+        logger.error("Failed to initialize SMS worker: %s", e)
 
 
 def run_email_worker():
@@ -135,18 +203,22 @@ def run_email_worker():
         while True:
             try:
                 stats = processor.process_messages(max_messages=10)
-                logger.info(f"Email: Processed {stats['processed']}, Failed {stats['failed']}, Deleted {stats['deleted']}")
-                time.sleep(5)
+                logger.info(
+                    "Email: Processed %d, Failed %d, Deleted %d",
+                    stats['processed'], stats['failed'], stats['deleted'],
+                )
+                if stats['processed'] == 0:
+                    time.sleep(IDLE_SLEEP_SECONDS)
                 
             except KeyboardInterrupt:
                 logger.info("Email Worker stopped by user")
                 break
             except Exception as e:
-                logger.error(f"Error in Email worker: {e}")
+                logger.error("Error in Email worker: %s", e)
                 time.sleep(30)
                 
     except Exception as e:
-        logger.error(f"Failed to initialize Email worker: {e}")
+        logger.error("Failed to initialize Email worker: %s", e)
 
 
 def main():
@@ -1,9 +1,42 @@
 from django.core.management.base import BaseCommand
 import json
 import os
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from django.db import models
 from django.apps import apps
 
+from external_models.management.commands.sync_models import is_sql_default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Threads used to read and parse definition files
+READ_WORKERS = 8
+
+
+@lru_cache(maxsize=None)
+def _field_class(name):
+    """Django field class for a definition type name, or None if unknown."""
+    return getattr(models, name, None)
+
+
+@lru_cache(maxsize=1024)
+def _model_name(table_name):
+    """Model class name for a table, e.g. lead_nurturing_campaign -> LeadNurturingCampaign."""
+    return ''.join(word.title() for word in table_name.split('_'))
+
+
+def _loads(payload):
+    """Parse one JSON model definition from bytes."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
 class Command(BaseCommand):
     help = 'Applies model definitions from JSON files to the models'
 
@@ -11,7 +44,10 @@ class Command(BaseCommand):
         parser.add_argument(
             '--input',
             type=str,
-            help='Input directory containing model definitions',
+            help=(
+                'Directory of <table>.json files or one .jsonl/.tar bundle written by '
+                'sync_models --format (a bundle wins over .json files), or a single bundle file'
+            ),
             default='model_definitions'
         )
         parser.add_argument(
@@ -22,38 +58,117 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        input_dir = options['input']
-        if not os.path.exists(input_dir):
+        input_path = options['input']
+        if not os.path.exists(input_path):
             self.stdout.write(
-                self.style.ERROR(f'Input directory {input_dir} does not exist')
+                self.style.ERROR(f'Input directory {input_path} does not exist')
             )
             return
 
-        for filename in os.listdir(input_dir):
-            if not filename.endswith('.json'):
-                continue
+        model_index = self.build_model_index()
+
+        for model_def in self.iter_model_definitions(input_path, options['model']):
+            self.update_model(model_def, model_index)
 
-            if options['model'] and filename != f"{options['model']}.json":
-                continue
+    def iter_model_definitions(self, input_path, model=None):
+        """
+        Yield model definitions from a directory or a single bundle file.
 
-            with open(os.path.join(input_dir, filename), 'r') as f:
-                model_def = json.load(f)
+        A directory holding a bundle is read from that bundle alone; one holding
+        several bundles is rejected.
 
-            self.update_model(model_def)
+        Args:
+            input_path: Definitions directory, or a .jsonl/.tar bundle
+            model: Only yield the definition for this table (optional)
 
-    def update_model(self, model_def):
+        Yields:
+            Model definition dicts
+        """
+        if not os.path.isdir(input_path):
+            yield from self._read_definitions(input_path, model)
+            return
+
+        with os.scandir(input_path) as entries:
+            paths = sorted(
+                entry.path for entry in entries
+                if entry.name.endswith(('.json', '.jsonl', '.tar')) and entry.is_file()
+            )
+        # A bundle holds every table, so mixing it with per-table files (or
+        # another bundle) would apply stale and fresh definitions of a table
+        bundles = [path for path in paths if path.endswith(('.jsonl', '.tar'))]
+        if len(bundles) > 1:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Multiple definition bundles in {input_path}: '
+                    f'{", ".join(os.path.basename(path) for path in bundles)}; keep only one'
+                )
+            )
+            return
+        if bundles and len(paths) > 1:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Using {os.path.basename(bundles[0])}; ignoring {len(paths) - 1} '
+                    f'per-table .json files in {input_path}'
+                )
+            )
+            paths = bundles
+        if len(paths) <= 1:
+            for path in paths:
+                yield from self._read_definitions(path, model)
+            return
+
+        # Read and parse files concurrently; results come back in path order
+        # and are yielded to the caller's thread, which alone touches models.
+        with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(paths))) as executor:
+            for model_defs in executor.map(lambda path: list(self._read_definitions(path, model)), paths):
+                yield from model_defs
+
+    def _read_definitions(self, path, model=None):
+        """Yield the definitions stored in one .json, .jsonl or .tar file."""
+        wanted = f"{model}.json" if model else None
+        if path.endswith('.jsonl'):
+            with open(path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    model_def = _loads(line)
+                    if not model or model_def.get('table_name') == model:
+                        yield model_def
+        elif path.endswith('.tar'):
+            with tarfile.open(path) as archive:
+                for member in archive:
+                    if not member.isfile() or not member.name.endswith('.json'):
+                        continue
+                    if wanted and os.path.basename(member.name) != wanted:
+                        continue
+                    yield _loads(archive.extractfile(member).read())
+        elif not wanted or os.path.basename(path) == wanted:
+            with open(path, 'rb') as f:
+                yield _loads(f.read())
+
+    @staticmethod
+    def build_model_index():
+        """
+        Map lowercased model names to models, first installed app winning on clashes.
+
+        Keys match AppConfig.get_model(), which ignores case, so tables such as
+        bland_ai_call still resolve to BlandAICall.
+        """
+        model_index = {}
+        for app_config in apps.get_app_configs():
+            for model in app_config.get_models(include_auto_created=True):
+                model_index.setdefault(model._meta.model_name, model)
+        return model_index
+
+    def update_model(self, model_def, model_index=None):
         """Update a model based on its definition"""
         table_name = model_def['table_name']
-        model_name = ''.join(word.title() for word in table_name.split('_'))
+        model_name = _model_name(table_name)
         
         # Find the model class
-        model = None
-        for app_config in apps.get_app_configs():
-            try:
-                model = app_config.get_model(model_name)
-                break
-            except LookupError:
-                continue
+        if model_index is None:
+            model_index = self.build_model_index()
+        model = model_index.get(model_name.lower())
 
         if not model:
             self.stdout.write(
@@ -61,11 +176,13 @@ class Command(BaseCommand):
             )
             return
 
-        # Update model fields
+        # Update model fields; definitions use column names, so index
+        # concrete fields by attname (e.g. lead_id) as well as by name
+        fields_by_name = {field.attname: field for field in model._meta.concrete_fields}
+        fields_by_name.update((field.name, field) for field in model._meta.get_fields())
         for field_def in model_def['fields']:
-            field_name = field_def['name']
-            if hasattr(model, field_name):
-                field = model._meta.get_field(field_name)
+            field = fields_by_name.get(field_def['name'])
+            if field is not None:
                 self.update_field(field, field_def)
 
         self.stdout.write(
@@ -74,16 +191,27 @@ class Command(BaseCommand):
 
     def update_field(self, field, field_def):
         """Update a field based on its definition"""
-        # Update field attributes
-        field.null = field_def.get('null', field.null)
-        field.blank = field_def.get('blank', field.blank)
-        
-        if 'default' in field_def:
+        # Update field attributes, leaving unchanged ones untouched
+        if 'null' in field_def and field.null != field_def['null']:
+            field.null = field_def['null']
+        if 'blank' in field_def and field.blank != field_def['blank']:
+            field.blank = field_def['blank']
+        if ('default' in field_def and not is_sql_default(field_def['default'])
+                and field.default != field_def['default']):
             field.default = field_def['default']
 
         # Update field type if needed
         new_type = field_def.get('type')
-        if new_type and not isinstance(field, getattr(models, new_type)):
+        if not new_type:
+            return
+        field_class = _field_class(new_type)
+        if field_class is None:
+            self.stdout.write(
+                self.style.WARNING(f'Unknown field type {new_type} for {field.name}')
+            )
+            return
+        # Exact class match is the common case; only then walk the MRO
+        if type(field) is not field_class and not isinstance(field, field_class):
             self.stdout.write(
                 self.style.WARNING(
                     f'Field type mismatch for {field.name}: '
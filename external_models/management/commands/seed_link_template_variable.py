@@ -1,41 +1,62 @@
 """
 Seed the ACS template variable category "link" and variable "short_link" for SMS short-link placeholders.
 Use placeholder {{link.short_link}} in templates when the rule has a short link assigned.
-Idempotent: safe to run multiple times (uses get_or_create).
+Idempotent: safe to run multiple times (existing rows are left untouched).
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from external_models.models.messages import TemplateVariableCategory, TemplateVariable
 
 
+LINK_CATEGORY_DEFAULTS = {
+    'description': 'Short link / tracking URL for SMS',
+    'model_name': 'link_tracking.Link',
+    'is_active': True,
+}
+
+# Variables seeded under the "link" category; add entries here to seed more
+LINK_VARIABLES = (
+    {
+        'name': 'short_link',
+        'field_name': 'short_link',
+        'description': 'Campaign short link with message tracking (only available when the rule has a short link assigned)',
+        'is_active': True,
+    },
+)
+
+
 class Command(BaseCommand):
     help = 'Seed link template variable category and short_link variable for {{link.short_link}} placeholder.'
 
     def handle(self, *args, **options):
-        category, created = TemplateVariableCategory.objects.get_or_create(
-            name='link',
-            defaults={
-                'description': 'Short link / tracking URL for SMS',
-                'model_name': 'link_tracking.Link',
-                'is_active': True,
-            },
-        )
-        if created:
+        with transaction.atomic():
+            category, category_created = TemplateVariableCategory.objects.only('id', 'name').get_or_create(
+                name='link',
+                defaults=LINK_CATEGORY_DEFAULTS,
+            )
+            # One SELECT for the variables that already exist, one INSERT for the rest
+            existing = set(
+                TemplateVariable.objects.filter(
+                    category=category, name__in=[v['name'] for v in LINK_VARIABLES]
+                ).values_list('name', flat=True)
+            )
+            variables = [TemplateVariable(category=category, **v) for v in LINK_VARIABLES]
+            missing = [variable for variable in variables if variable.name not in existing]
+            if missing:
+                # A concurrent seeder may insert the same rows; the unique
+                # (category, name) constraint turns that into a no-op.
+                TemplateVariable.objects.bulk_create(missing, ignore_conflicts=True)
+
+        if category_created:
             self.stdout.write(self.style.SUCCESS('Created TemplateVariableCategory: link'))
         else:
             self.stdout.write('TemplateVariableCategory "link" already exists.')
 
-        variable, created = TemplateVariable.objects.get_or_create(
-            category=category,
-            name='short_link',
-            defaults={
-                'field_name': 'short_link',
-                'description': 'Campaign short link with message tracking (only available when the rule has a short link assigned)',
-                'is_active': True,
-            },
-        )
-        if created:
-            self.stdout.write(self.style.SUCCESS(f'Created TemplateVariable: {variable.get_placeholder()}'))
-        else:
-            self.stdout.write(f'TemplateVariable "short_link" already exists. Placeholder: {variable.get_placeholder()}')
+        for variable in variables:
+            placeholder = variable.get_placeholder()
+            if variable.name in existing:
+                self.stdout.write(f'TemplateVariable "{variable.name}" already exists. Placeholder: {placeholder}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'Created TemplateVariable: {placeholder}'))
 
         self.stdout.write(self.style.SUCCESS('Done. Use {{link.short_link}} in SMS templates when the rule has a short link.'))
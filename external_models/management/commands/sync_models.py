@@ -1,9 +1,70 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
-from django.apps import apps
-import inspect
+import hashlib
+import io
 import json
 import os
+import tarfile
+from contextlib import ExitStack, closing
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Bundle file names written by --format jsonl / tar
+DEFINITIONS_JSONL = 'model_definitions.jsonl'
+DEFINITIONS_TAR = 'model_definitions.tar'
+
+# Database column type -> Django field class name
+_TYPE_MAPPING = {
+    'varchar': 'CharField',
+    'text': 'TextField',
+    'int': 'IntegerField',
+    'bigint': 'BigIntegerField',
+    'datetime': 'DateTimeField',
+    'date': 'DateField',
+    'boolean': 'BooleanField',
+    'decimal': 'DecimalField',
+    'json': 'JSONField',
+    # Add more mappings as needed
+}
+
+
+# Column defaults starting with these are evaluated by the database
+_SQL_DEFAULT_PREFIXES = ('NEXTVAL', 'CURRENT_', 'NOW(', 'LOCALTIMESTAMP', 'UUID(', 'GEN_RANDOM_UUID(')
+
+
+def is_sql_default(value):
+    """True if a column default is a SQL expression rather than a literal value."""
+    return isinstance(value, str) and (
+        value.lstrip('(').upper().startswith(_SQL_DEFAULT_PREFIXES) or '::' in value
+    )
+
+
+@lru_cache(maxsize=256)
+def _map_db_type(db_type):
+    """Django field class name for a column type; only a handful of distinct types occur."""
+    return _TYPE_MAPPING.get(db_type.partition('(')[0].lower(), 'CharField')
+
+
+def _dumps(model_def, indent=False):
+    """Serialize a model definition to bytes, pretty-printed when ``indent``."""
+    if orjson is not None:
+        return orjson.dumps(model_def, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(model_def, indent=2 if indent else None).encode()
+
+
+def _loads(payload):
+    """Parse JSON bytes written by :func:`_dumps`."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 
 class Command(BaseCommand):
     help = 'Synchronizes model definitions from the external application'
@@ -27,52 +88,307 @@ class Command(BaseCommand):
             help='Output directory for model definitions',
             default='model_definitions'
         )
+        parser.add_argument(
+            '--format',
+            choices=['dir', 'jsonl', 'tar'],
+            default='dir',
+            help=(
+                'dir: one <table>.json per table; jsonl/tar: a single '
+                f'{DEFINITIONS_JSONL} or {DEFINITIONS_TAR} in the output directory'
+            )
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help=(
+                'Reuse column listings from --cache-dir while the schema fingerprint is '
+                'unchanged. On MySQL the fingerprint itself scans information_schema.columns, '
+                'so a cache hit only saves the per-table SHOW COLUMNS round trips and row '
+                'transfer, not the catalog scan. See schema_fingerprint() for changes it can miss'
+            )
+        )
+        parser.add_argument(
+            '--cache-dir',
+            type=str,
+            help='Directory for cached column listings, keyed on a schema fingerprint',
+            default='.sync_models_cache'
+        )
 
     def handle(self, *args, **options):
         # Create output directory if it doesn't exist
         output_dir = options['output']
         os.makedirs(output_dir, exist_ok=True)
 
-        # Get all models from the external database
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT table_name, column_name, data_type, is_nullable, column_default
+        if options['cache']:
+            table_columns = self.cached_table_columns(options['cache_dir'], options['app'], options['model'])
+        else:
+            table_columns = self.iter_table_columns(options['app'], options['model'])
+
+        # Generate model definitions while streaming the requested tables'
+        # columns, so only one table is held in memory at a time
+        with ExitStack() as stack:
+            write_definition = self.open_definition_writer(stack, output_dir, options['format'])
+            for table, columns in table_columns:
+                if options['app'] and not table.startswith(options['app']):
+                    continue
+
+                if options['model'] and table != options['model']:
+                    continue
+
+                model_def = self.generate_model_definition(table, columns)
+                write_definition(table, model_def)
+
+                self.stdout.write(
+                    self.style.SUCCESS(f'Successfully generated model definition for {table}')
+                )
+
+    def open_definition_writer(self, stack, output_dir, output_format='dir'):
+        """
+        Return a ``write(table, model_def)`` callable for the output format.
+
+        Args:
+            stack: ExitStack that owns any bundle file opened here
+            output_dir: Directory the definitions are written to
+            output_format: ``dir``, ``jsonl`` or ``tar``
+
+        Returns:
+            Callable writing one model definition
+        """
+        if output_format == 'jsonl':
+            bundle = stack.enter_context(open(os.path.join(output_dir, DEFINITIONS_JSONL), 'wb'))
+
+            def write(table, model_def):
+                bundle.write(_dumps(model_def) + b'\n')
+        elif output_format == 'tar':
+            archive = stack.enter_context(tarfile.open(os.path.join(output_dir, DEFINITIONS_TAR), 'w'))
+
+            def write(table, model_def):
+                payload = _dumps(model_def, indent=True)
+                info = tarfile.TarInfo(name=f"{table}.json")
+                info.size = len(payload)
+                archive.addfile(info, io.BytesIO(payload))
+        else:
+            def write(table, model_def):
+                with open(os.path.join(output_dir, f"{table}.json"), 'wb') as f:
+                    f.write(_dumps(model_def, indent=True))
+        return write
+
+    def schema_fingerprint(self):
+        """
+        Cheap fingerprint of the current schema, or None if the backend has none.
+
+        MySQL sums a CRC32 of every column's table, name, position, type,
+        nullability and default from information_schema.columns, which reads the
+        data dictionary directly (unlike the CREATE/UPDATE_TIME stats, INSTANT
+        ALTERs show up immediately). That is a full catalog scan, so on MySQL
+        the cache saves round trips and transfer but not the scan.
+
+        PostgreSQL uses the row counts and newest xmin of pg_class, pg_attribute
+        and pg_attrdef, which cover table renames, column changes and column
+        defaults.
+
+        Remaining staleness window: a CRC32 sum collision on MySQL, or on
+        PostgreSQL a change whose catalog row is not the newest after transaction
+        ID wraparound. Both are unlikely but possible, which is why caching is
+        opt-in via --cache.
+        """
+        if connection.vendor == 'mysql':
+            sql = """
+                SELECT COUNT(*), SUM(CRC32(CONCAT_WS('|', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION,
+                                                     COLUMN_TYPE, IS_NULLABLE, COLUMN_DEFAULT)))
                 FROM information_schema.columns
-                WHERE table_schema = DATABASE()
-                ORDER BY table_name, ordinal_position;
-            """)
-            columns = cursor.fetchall()
-
-        # Organize columns by table
-        table_columns = {}
-        for table, column, data_type, is_nullable, default in columns:
-            if table not in table_columns:
-                table_columns[table] = []
-            table_columns[table].append({
-                'name': column,
-                'type': data_type,
-                'nullable': is_nullable == 'YES',
-                'default': default
-            })
-
-        # Generate model definitions
-        for table, columns in table_columns.items():
-            if options['app'] and not table.startswith(options['app']):
-                continue
-
-            if options['model'] and table != options['model']:
-                continue
-
-            model_def = self.generate_model_definition(table, columns)
-            
-            # Save to file
-            output_file = os.path.join(output_dir, f"{table}.json")
-            with open(output_file, 'w') as f:
-                json.dump(model_def, f, indent=2)
-
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully generated model definition for {table}')
-            )
+                WHERE table_schema = DATABASE();
+            """
+        elif connection.vendor == 'postgresql':
+            sql = """
+                SELECT (SELECT count(*) FROM pg_class), (SELECT max(xmin::text::bigint) FROM pg_class),
+                       (SELECT count(*) FROM pg_attribute), (SELECT max(xmin::text::bigint) FROM pg_attribute),
+                       (SELECT count(*) FROM pg_attrdef), (SELECT max(xmin::text::bigint) FROM pg_attrdef);
+            """
+        else:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchone()
+
+    def cached_table_columns(self, cache_dir, app_prefix=None, table=None):
+        """
+        Column definitions from the on-disk cache when the schema is unchanged.
+
+        Args:
+            cache_dir: Directory holding cached listings
+            app_prefix: Only include tables whose name starts with this prefix
+            table: Only include this table
+
+        Returns:
+            Iterable of ``(table_name, columns)`` pairs, as iter_table_columns
+        """
+        fingerprint = self.schema_fingerprint()
+        if fingerprint is None:
+            return self.iter_table_columns(app_prefix, table)
+
+        key = repr((connection.vendor, connection.settings_dict.get('NAME'), fingerprint, app_prefix, table))
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        cache_path = os.path.join(cache_dir, f'{digest}.jsonl')
+        if os.path.exists(cache_path):
+            return self._iter_cached_columns(cache_path)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        return self._iter_and_cache_columns(self.iter_table_columns(app_prefix, table), cache_path)
+
+    @staticmethod
+    def _iter_cached_columns(cache_path):
+        """Yield ``(table_name, columns)`` pairs from a cache file."""
+        with open(cache_path, 'rb') as f:
+            for line in f:
+                table, columns = _loads(line)
+                yield table, columns
+
+    @staticmethod
+    def _iter_and_cache_columns(table_columns, cache_path):
+        """Pass pairs through while writing them to the cache; keep it only if complete."""
+        tmp_path = f'{cache_path}.tmp'
+        complete = False
+        try:
+            with open(tmp_path, 'wb') as f:
+                for table, columns in table_columns:
+                    f.write(_dumps([table, columns]) + b'\n')
+                    yield table, columns
+            complete = True
+        finally:
+            if complete:
+                os.replace(tmp_path, cache_path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def iter_table_columns(self, app_prefix=None, table=None):
+        """
+        Yield column definitions table by table, filtering in the database.
+
+        Args:
+            app_prefix: Only include tables whose name starts with this prefix
+            table: Only include this table
+
+        Yields:
+            ``(table_name, columns)`` pairs, where columns is a list of dicts
+            with ``name``, ``type``, ``nullable`` and ``default`` keys
+        """
+        if table and app_prefix and not table.startswith(app_prefix):
+            return
+
+        if connection.vendor == 'mysql' and (table or app_prefix):
+            with connection.cursor() as cursor:
+                yield from self._iter_mysql_columns(cursor, app_prefix, table)
+            return
+
+        # The catalog queries can return every column in the database, so
+        # stream them from the server rather than buffering the result set
+        with self._streaming_cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                yield from self._iter_postgresql_columns(cursor, app_prefix, table)
+            else:
+                yield from self._iter_information_schema_columns(cursor, app_prefix, table)
+
+    @staticmethod
+    def _streaming_cursor():
+        """Cursor that fetches rows from the server in chunks where the backend allows it."""
+        if connection.vendor == 'mysql':
+            # Django's MySQL cursor buffers the whole result; use an unbuffered one
+            from MySQLdb.cursors import SSCursor
+
+            connection.ensure_connection()
+            return closing(connection.connection.cursor(SSCursor))
+        # Server-side (named) cursor on PostgreSQL, a regular cursor elsewhere
+        return connection.chunked_cursor()
+
+    def _iter_mysql_columns(self, cursor, app_prefix, table):
+        """SHOW COLUMNS per requested table, avoiding a full information_schema scan."""
+        # Resolve --model through SHOW TABLES too, so a missing table yields
+        # nothing instead of SHOW COLUMNS raising
+        pattern = self._like_escape(table) if table else self._like_prefix(app_prefix)
+        cursor.execute('SHOW TABLES LIKE %s', [pattern])
+        tables = [row[0] for row in cursor.fetchall()]
+
+        for name in tables:
+            cursor.execute(f'SHOW COLUMNS FROM {connection.ops.quote_name(name)}')
+            # SHOW COLUMNS reports the full column type (e.g. "int unsigned",
+            # "varchar(255)"); keep the bare type like information_schema's data_type.
+            yield name, [
+                {
+                    'name': field,
+                    'type': column_type.split('(')[0].split(' ')[0],
+                    'nullable': is_nullable == 'YES',
+                    'default': default
+                }
+                for field, column_type, is_nullable, _key, default, _extra in cursor.fetchall()
+            ]
+
+    def _iter_postgresql_columns(self, cursor, app_prefix, table):
+        """Single catalog join over pg_class/pg_attribute for the matching tables."""
+        if table:
+            name_filter, param = 'c.relname = %s', table
+        else:
+            name_filter, param = 'c.relname LIKE %s', self._like_prefix(app_prefix or '')
+        cursor.execute(f"""
+            SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+                   a.attnotnull, pg_get_expr(d.adbin, d.adrelid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid
+            LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+            WHERE c.relkind = 'r' AND n.nspname = current_schema()
+              AND a.attnum > 0 AND NOT a.attisdropped AND {name_filter}
+            ORDER BY c.relname, a.attnum;
+        """, [param])
+
+        # Rows are ordered by table, so group them as they stream in
+        for name, rows in groupby(cursor, key=itemgetter(0)):
+            yield name, [
+                {
+                    'name': column,
+                    'type': data_type.split('(')[0],
+                    'nullable': not not_null,
+                    'default': default
+                }
+                for _, column, data_type, not_null, default in rows
+            ]
+
+    def _iter_information_schema_columns(self, cursor, app_prefix, table):
+        """information_schema query with the table filter pushed into SQL."""
+        sql = """
+            SELECT table_name, column_name, data_type, is_nullable, column_default
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE()
+        """
+        params = []
+        if table:
+            sql += ' AND table_name = %s'
+            params.append(table)
+        elif app_prefix:
+            sql += ' AND table_name LIKE %s'
+            params.append(self._like_prefix(app_prefix))
+        cursor.execute(sql + ' ORDER BY table_name, ordinal_position;', params)
+
+        for name, rows in groupby(cursor, key=itemgetter(0)):
+            yield name, [
+                {
+                    'name': column,
+                    'type': data_type,
+                    'nullable': is_nullable == 'YES',
+                    'default': default
+                }
+                for _, column, data_type, is_nullable, default in rows
+            ]
+
+    @staticmethod
+    def _like_escape(name):
+        """LIKE pattern matching ``name`` literally."""
+        return name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    @classmethod
+    def _like_prefix(cls, prefix):
+        """LIKE pattern matching names that start with ``prefix`` literally."""
+        return f'{cls._like_escape(prefix)}%'
 
     def generate_model_definition(self, table, columns):
         """Generate a model definition from table columns"""
@@ -93,7 +409,9 @@ class Command(BaseCommand):
                 'blank': column['nullable']
             }
 
-            if column['default']:
+            # Database-evaluated defaults (sequences, CURRENT_TIMESTAMP) are not
+            # Python values; leave them to the database
+            if column['default'] and not is_sql_default(column['default']):
                 field_def['default'] = column['default']
 
             model_def['fields'].append(field_def)
@@ -102,18 +420,4 @@ class Command(BaseCommand):
 
     def map_db_type_to_django(self, db_type):
         """Map database types to Django field types"""
-        type_mapping = {
-            'varchar': 'CharField',
-            'text': 'TextField',
-            'int': 'IntegerField',
-            'bigint': 'BigIntegerField',
-            'datetime': 'DateTimeField',
-            'date': 'DateField',
-            'boolean': 'BooleanField',
-            'decimal': 'DecimalField',
-            'json': 'JSONField',
-            # Add more mappings as needed
-        }
-
-        base_type = db_type.split('(')[0].lower()
-        return type_mapping.get(base_type, 'CharField') 
\ No newline at end of file
+        return _map_db_type(db_type)
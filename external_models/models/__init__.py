@@ -84,6 +84,7 @@ __all__ = [
 
     # Blast Campaigns
     'BlastCampaignSchedule',
+    'BlastCampaignProgress',
 
     # Journey Campaigns
     'JourneyCampaignSchedule',
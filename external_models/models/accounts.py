@@ -1,13 +1,25 @@
 
+from importlib.resources import files
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-import pytz
+
+# Built once at import from the zone list shipped with the pinned tzdata
+# package, not zoneinfo.available_timezones(), which prefers the host's
+# system tz database; sorted so the choices are the same on every host.
+# 'Factory' is a tz database placeholder rather than a zone, and
+# pytz.all_timezones never listed it.
+_TZ_CHOICES = tuple(
+    (tz, tz)
+    for tz in sorted(set(files('tzdata').joinpath('zones').read_text().split()) - {'Factory'})
+)
+
 
 class User(AbstractUser):
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     timezone = models.CharField(
         max_length=50,
-        choices=[(tz, tz) for tz in pytz.all_timezones],
+        choices=_TZ_CHOICES,
         default='UTC'
     )
 
@@ -1,9 +1,166 @@
+from types import MappingProxyType
+
+import fastjsonschema
 from django.db import models
+from django.db.models import prefetch_related_objects
 from django.core.exceptions import ValidationError
 from .communications import ContactEndpoint
 from .messages import MessageTemplate
 
-class EmailConfig(models.Model):
+# Choices shared by the channel config models
+_PRIORITY_CHOICES = (('high', 'High'), ('normal', 'Normal'), ('low', 'Low'))
+_VOICE_PLATFORM_CHOICES = (
+    ('bland_ai', 'Bland AI'),
+    ('vapi', 'VAPI'),
+    ('elevenlabs', 'ElevenLabs'),
+    ('twilio', 'Twilio'),
+)
+_VOICEMAIL_ACTION_CHOICES = (
+    ('hangup', 'Hang Up'),
+    ('leave_message', 'Leave Message'),
+    ('ignore', 'Ignore'),
+)
+_CHAT_PLATFORM_CHOICES = (('whatsapp', 'WhatsApp'), ('messenger', 'Messenger'), ('telegram', 'Telegram'))
+
+# Shared read-only default for absent platform_config sections
+_EMPTY = MappingProxyType({})
+
+# Bland AI platform_config rules, compiled on first use by _get_validator
+_BLAND_AI_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'interruption_threshold': {'type': 'integer'},
+        'pathway_version': {'type': 'integer'},
+        'max_duration': {'type': 'integer'},
+        'temperature': {'type': 'number'},
+        'dynamic_data': {'type': 'array'},
+        'keywords': {'type': 'array'},
+        'pronunciation_guide': {'type': 'array'},
+        'webhook_events': {'type': 'array'},
+        'available_tags': {'type': 'array'},
+        'background_track': {'type': ['string', 'null'], 'pattern': '^https?://'},
+    },
+}
+# JSON Schema's "integer" also accepts 100.0; these keys must be real ints
+_BLAND_AI_INT_FIELDS = ('interruption_threshold', 'pathway_version', 'max_duration')
+# Schema failures are reported with these messages, keyed by platform_config key
+_BLAND_AI_ERRORS = {
+    'interruption_threshold': "interruption_threshold must be an integer",
+    'pathway_version': "pathway_version must be an integer",
+    'max_duration': "max_duration must be an integer",
+    'temperature': "temperature must be a number",
+    'dynamic_data': "dynamic_data must be a list",
+    'keywords': "keywords must be a list",
+    'pronunciation_guide': "pronunciation_guide must be a list",
+    'webhook_events': "webhook_events must be a list",
+    'available_tags': "available_tags must be a list",
+    'background_track': "background_track must be a valid URL",
+}
+
+# id(schema) -> (schema, compiled validator); the schema is held so its id can't be reused
+_validator_cache = {}
+
+
+def _get_validator(schema):
+    """Return the fastjsonschema validator for schema, compiling it once per process.
+
+    Args:
+        schema: JSON Schema dict; must not be mutated after its first lookup
+
+    Returns:
+        Callable that raises JsonSchemaValueException for invalid data
+    """
+    entry = _validator_cache.get(id(schema))
+    if entry is None:
+        entry = _validator_cache[id(schema)] = (schema, fastjsonschema.compile(schema))
+    return entry[1]
+
+
+_VAPI_ALLOWED_MODELS = frozenset({'gpt-4', 'gpt-3.5-turbo'})
+_VAPI_CONFIG_TYPE_ERROR = "VAPI platform_config must be an object"
+
+# Common Bland AI fields passed through from platform_config to the API call
+_BLAND_AI_PASSTHROUGH_FIELDS = frozenset({
+    'pathway_id',
+    'background_track',
+    'first_sentence',
+    'wait_for_greeting',
+    'block_interruptions',
+    'interruption_threshold',
+    'model',
+    'temperature',
+    'dynamic_data',
+    'keywords',
+    'pronunciation_guide',
+    'transfer_phone_number',
+    'transfer_list',
+    'pathway_version',
+    'local_dialing',
+    'voicemail_sms',
+    'dispatch_hours',
+    'ignore_button_press',
+    'timezone',
+    'request_data',
+    'tools',
+    'start_time',
+    'retry',
+    'citation_schema_id',
+    'analysis_preset',
+    'available_tags',
+    'geospatial_dialing',
+    'precall_dtmf_sequence',
+})
+
+class _ConfigManager(models.Manager):
+    """Loads from_endpoint and template with the config, since clean() and the send paths read both."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('from_endpoint', 'template')
+
+
+class _EndpointConfigMixin:
+    """Shared helpers for configs that send from a ContactEndpoint."""
+
+    @classmethod
+    def bulk_validate(cls, configs):
+        """
+        Run clean() on many configs, loading their endpoints and channels up front.
+
+        Endpoints are deduplicated by id and their channels prefetched together,
+        including endpoints already cached by _ConfigManager's select_related,
+        so validation costs at most one endpoint query and one channels query.
+
+        Args:
+            configs: Iterable of instances of this config class
+
+        Raises:
+            ValidationError: From the first config that fails clean()
+        """
+        configs = list(configs)
+        from_endpoint = cls._meta.get_field('from_endpoint')
+        endpoints = {}
+        pending = []
+        for config in configs:
+            if from_endpoint.is_cached(config):
+                endpoint = config.from_endpoint
+                if endpoint is not None:
+                    # Configs sharing an endpoint id share its first instance
+                    config.from_endpoint = endpoints.setdefault(endpoint.pk, endpoint)
+            elif config.from_endpoint_id:
+                pending.append(config)
+        missing = {c.from_endpoint_id for c in pending} - endpoints.keys()
+        if missing:
+            endpoints.update(ContactEndpoint.objects.in_bulk(missing))
+        for config in pending:
+            endpoint = endpoints.get(config.from_endpoint_id)
+            if endpoint is not None:
+                config.from_endpoint = endpoint
+        prefetch_related_objects(list(endpoints.values()), 'channels')
+        for config in configs:
+            config.clean()
+
+
+class EmailConfig(_EndpointConfigMixin, models.Model):
     MODE_INLINE = 'inline'
     MODE_OUTBOUND_ACS = 'outbound_acs'
     MODE_HOSTED_MAILGUN = 'hosted_mailgun'
@@ -31,54 +188,53 @@ class EmailConfig(models.Model):
     from_endpoint = models.ForeignKey(ContactEndpoint, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     from_name = models.CharField(max_length=255, blank=True, null=True)
     reply_to = models.EmailField(blank=True, null=True)
-    priority = models.CharField(max_length=10, choices=[('high', 'High'), ('normal', 'Normal'), ('low', 'Low')], blank=True, null=True)
+    priority = models.CharField(max_length=10, choices=_PRIORITY_CHOICES, blank=True, null=True)
     track_opens = models.BooleanField(default=False)
     track_clicks = models.BooleanField(default=False)
     attachments = models.JSONField(blank=True, null=True, help_text="List of attachments: [{name, url}]")
 
+    objects = _ConfigManager()
+
     class Meta:
         managed = False
         db_table = 'acs_emailconfig'
 
     def clean(self):
         super().clean()
-        if self.from_endpoint and 'email' not in self.from_endpoint.get_channel_list():
+        if self.from_endpoint and 'email' not in self.from_endpoint.get_channel_set():
             raise ValidationError("Selected endpoint must be an email endpoint")
 
     def get_from_email(self):
         return self.from_endpoint.value if self.from_endpoint else None
 
-class SMSConfig(models.Model):
+class SMSConfig(_EndpointConfigMixin, models.Model):
     content = models.TextField(blank=True, null=True)
     template = models.ForeignKey(MessageTemplate, on_delete=models.SET_NULL, null=True, blank=True, related_name='sms_configs')
     from_endpoint = models.ForeignKey(ContactEndpoint, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
-    priority = models.CharField(max_length=10, choices=[('high', 'High'), ('normal', 'Normal'), ('low', 'Low')], blank=True, null=True)
+    priority = models.CharField(max_length=10, choices=_PRIORITY_CHOICES, blank=True, null=True)
     track_delivery = models.BooleanField(default=False)
     track_replies = models.BooleanField(default=False)
     media_urls = models.JSONField(blank=True, null=True, help_text="List of media URLs")
 
+    objects = _ConfigManager()
+
     class Meta:
         managed = False
         db_table = 'acs_smsconfig'
 
     def clean(self):
         super().clean()
-        if self.from_endpoint and 'sms' not in self.from_endpoint.get_channel_list():
+        if self.from_endpoint and 'sms' not in self.from_endpoint.get_channel_set():
             raise ValidationError("Selected endpoint must be an SMS endpoint")
 
     def get_from_number(self):
         return self.from_endpoint.value if self.from_endpoint else self.from_number
 
-class VoiceConfig(models.Model):
+class VoiceConfig(_EndpointConfigMixin, models.Model):
     # Platform Configuration
     platform = models.CharField(
         max_length=20, 
-        choices=[
-            ('bland_ai', 'Bland AI'),
-            ('vapi', 'VAPI'),
-            ('elevenlabs', 'ElevenLabs'),
-            ('twilio', 'Twilio'),
-        ],
+        choices=_VOICE_PLATFORM_CHOICES,
         default='bland_ai'
     )
     
@@ -94,7 +250,7 @@ class VoiceConfig(models.Model):
     temperature = models.FloatField(blank=True, null=True, help_text="Voice temperature/similarity (0.0-1.0)")
     
     # Call Configuration (normalized common fields)
-    priority = models.CharField(max_length=10, choices=[('high', 'High'), ('normal', 'Normal'), ('low', 'Low')], blank=True, null=True)
+    priority = models.CharField(max_length=10, choices=_PRIORITY_CHOICES, blank=True, null=True)
     max_duration = models.PositiveIntegerField(blank=True, null=True, help_text="Maximum call duration in minutes")
     record_call = models.BooleanField(default=False)
     call_timeout = models.PositiveIntegerField(blank=True, null=True, help_text="Timeout in seconds")
@@ -107,11 +263,7 @@ class VoiceConfig(models.Model):
     voicemail_message = models.TextField(blank=True, null=True)
     voicemail_action = models.CharField(
         max_length=20,
-        choices=[
-            ('hangup', 'Hang Up'),
-            ('leave_message', 'Leave Message'),
-            ('ignore', 'Ignore')
-        ],
+        choices=_VOICEMAIL_ACTION_CHOICES,
         blank=True,
         null=True
     )
@@ -133,13 +285,27 @@ class VoiceConfig(models.Model):
     # Metadata (JSON for extensibility)
     metadata = models.JSONField(blank=True, null=True)
 
+    objects = _ConfigManager()
+
     class Meta:
         managed = False
         db_table = 'acs_voiceconfig'
 
+    # platform -> method name, resolved with one dict lookup per call
+    _PLATFORM_VALIDATORS = {
+        'bland_ai': '_validate_bland_ai_config',
+        'vapi': '_validate_vapi_config',
+        'elevenlabs': '_validate_elevenlabs_config',
+    }
+    _PLATFORM_BUILDERS = {
+        'bland_ai': '_get_bland_ai_config',
+        'vapi': '_get_vapi_config',
+        'elevenlabs': '_get_elevenlabs_config',
+    }
+
     def clean(self):
         super().clean()
-        if self.from_endpoint and 'voice' not in self.from_endpoint.get_channel_list():
+        if self.from_endpoint and 'voice' not in self.from_endpoint.get_channel_set():
             raise ValidationError("Selected endpoint must be a voice endpoint")
         
         # Platform-specific validation
@@ -147,65 +313,41 @@ class VoiceConfig(models.Model):
 
     def _validate_platform_config(self):
         """Validate platform-specific configuration"""
-        if not self.platform_config:
+        config = self.platform_config
+        if not config:
             return
             
-        if self.platform == 'bland_ai':
-            self._validate_bland_ai_config()
-        elif self.platform == 'vapi':
-            self._validate_vapi_config()
-        elif self.platform == 'elevenlabs':
-            self._validate_elevenlabs_config()
-
-    def _validate_bland_ai_config(self):
+        validator = self._PLATFORM_VALIDATORS.get(self.platform)
+        if validator:
+            getattr(self, validator)(config)
+
+    def _validate_bland_ai_config(self, config):
         """Validate Bland AI specific configuration"""
-        config = self.platform_config or {}
-        
-        # Validate Bland AI specific fields
-        if 'interruption_threshold' in config and not isinstance(config['interruption_threshold'], int):
-            raise ValidationError("interruption_threshold must be an integer")
-        
-        if 'background_track' in config and not config['background_track'].startswith('http'):
-            raise ValidationError("background_track must be a valid URL")
-        
-        if 'pathway_version' in config and not isinstance(config['pathway_version'], int):
-            raise ValidationError("pathway_version must be an integer")
-        
-        if 'max_duration' in config and not isinstance(config['max_duration'], int):
-            raise ValidationError("max_duration must be an integer")
-        
-        if 'temperature' in config and not isinstance(config['temperature'], (int, float)):
-            raise ValidationError("temperature must be a number")
-        
-        if 'dynamic_data' in config and not isinstance(config['dynamic_data'], list):
-            raise ValidationError("dynamic_data must be a list")
-        
-        if 'keywords' in config and not isinstance(config['keywords'], list):
-            raise ValidationError("keywords must be a list")
-        
-        if 'pronunciation_guide' in config and not isinstance(config['pronunciation_guide'], list):
-            raise ValidationError("pronunciation_guide must be a list")
-        
-        if 'webhook_events' in config and not isinstance(config['webhook_events'], list):
-            raise ValidationError("webhook_events must be a list")
-        
-        if 'available_tags' in config and not isinstance(config['available_tags'], list):
-            raise ValidationError("available_tags must be a list")
+        try:
+            _get_validator(_BLAND_AI_SCHEMA)(config)
+        except fastjsonschema.JsonSchemaValueException as e:
+            # e.path is ['data', <key>, ...] for a field error, ['data'] for the config itself
+            field = e.path[1] if len(e.path) > 1 else None
+            raise ValidationError(_BLAND_AI_ERRORS.get(field, e.message)) from None
+        for key in _BLAND_AI_INT_FIELDS:
+            if isinstance(config.get(key), float):
+                raise ValidationError(_BLAND_AI_ERRORS[key])
 
-    def _validate_vapi_config(self):
+    def _validate_vapi_config(self, config):
         """Validate VAPI specific configuration"""
-        config = self.platform_config or {}
-        
+        # JSONField also stores lists and strings, which have no .get()
+        if not isinstance(config, dict):
+            raise ValidationError(_VAPI_CONFIG_TYPE_ERROR)
         # Validate VAPI specific fields
-        if 'assistant' in config:
-            assistant = config['assistant']
-            if 'model' in assistant and assistant['model'] not in ['gpt-4', 'gpt-3.5-turbo']:
+        assistant = config.get('assistant')
+        if assistant and 'model' in assistant:
+            model = assistant['model']
+            # Unhashable values can't be in the frozenset and would raise TypeError
+            if not isinstance(model, str) or model not in _VAPI_ALLOWED_MODELS:
                 raise ValidationError("Invalid VAPI assistant model")
 
-    def _validate_elevenlabs_config(self):
+    def _validate_elevenlabs_config(self, config):
         """Validate ElevenLabs specific configuration"""
-        config = self.platform_config or {}
-        
         # Validate ElevenLabs specific fields
         if 'voice_settings' in config:
             voice_settings = config['voice_settings']
@@ -217,6 +359,8 @@ class VoiceConfig(models.Model):
 
     def get_platform_config(self):
         """Get complete configuration for the selected platform"""
+        # Bland AI maps webhook_config to its own keys in _get_bland_ai_config
+        webhook_config = _EMPTY if self.platform == 'bland_ai' else (self.webhook_config or _EMPTY)
         base_config = {
             'phone_number': None,  # Will be set by caller
             'from': self.get_from_number(),
@@ -226,35 +370,25 @@ class VoiceConfig(models.Model):
             'max_duration': self.max_duration,
             'record': self.record_call,
             'metadata': self.metadata,
+            # Add webhook config
+            **webhook_config,
         }
         
-        # Add webhook config
-        if self.webhook_config:
-            base_config.update(self.webhook_config)
-        
         # Add platform-specific configuration
-        if self.platform == 'bland_ai':
-            return self._get_bland_ai_config(base_config)
-        elif self.platform == 'vapi':
-            return self._get_vapi_config(base_config)
-        elif self.platform == 'elevenlabs':
-            return self._get_elevenlabs_config(base_config)
+        builder = self._PLATFORM_BUILDERS.get(self.platform)
+        if builder:
+            return getattr(self, builder)(base_config)
         
         return base_config
 
     def _get_bland_ai_config(self, base_config):
         """Get Bland AI specific configuration"""
-        config = base_config.copy()
-        
-        # Map normalized fields to Bland AI API
-        config.update({
+        # voice/language/max_duration/record/metadata already come from
+        # base_config under the names Bland AI expects
+        config = {
+            **base_config,
             'task': self.content,  # Bland AI uses 'task' instead of 'content'
-            'voice': self.voice_id,
-            'language': self.language,
-            'max_duration': self.max_duration,
-            'record': self.record_call,
-            'metadata': self.metadata,
-        })
+        }
         
         # Map voicemail fields
         if self.voicemail_message:
@@ -269,105 +403,76 @@ class VoiceConfig(models.Model):
             if 'events' in self.webhook_config:
                 config['webhook_events'] = self.webhook_config['events']
         
-        # Add all Bland AI specific configuration from platform_config
-        if self.platform_config:
-            # Common Bland AI fields that should be in platform_config
-            bland_ai_fields = [
-                'pathway_id',
-                'background_track',
-                'first_sentence',
-                'wait_for_greeting',
-                'block_interruptions',
-                'interruption_threshold',
-                'model',
-                'temperature',
-                'dynamic_data',
-                'keywords',
-                'pronunciation_guide',
-                'transfer_phone_number',
-                'transfer_list',
-                'pathway_version',
-                'local_dialing',
-                'voicemail_sms',
-                'dispatch_hours',
-                'ignore_button_press',
-                'timezone',
-                'request_data',
-                'tools',
-                'start_time',
-                'retry',
-                'citation_schema_id',
-                'analysis_preset',
-                'available_tags',
-                'geospatial_dialing',
-                'precall_dtmf_sequence'
-            ]
-            
-            for field in bland_ai_fields:
-                if field in self.platform_config:
-                    config[field] = self.platform_config[field]
+        # Copy the Bland AI fields present in platform_config
+        for field, value in (self.platform_config or _EMPTY).items():
+            if field in _BLAND_AI_PASSTHROUGH_FIELDS:
+                config[field] = value
         
         return config
 
     def _get_vapi_config(self, base_config):
         """Get VAPI specific configuration"""
-        config = base_config.copy()
-        config.update({
+        if self.platform_config and not isinstance(self.platform_config, dict):
+            raise ValidationError(_VAPI_CONFIG_TYPE_ERROR)
+        platform_config = self.platform_config or _EMPTY
+        assistant_config = platform_config.get('assistant', _EMPTY)
+        voice_config = platform_config.get('voice', _EMPTY)
+        config = {
+            **base_config,
             'assistant': {
                 'name': self.voice_name,
-                'model': self.platform_config.get('assistant', {}).get('model', 'gpt-4'),
+                'model': assistant_config.get('model', 'gpt-4'),
                 'voice': self.voice_id,
-                'interruptions': not self.platform_config.get('block_interruptions', False),
+                'interruptions': not platform_config.get('block_interruptions', False),
             },
             'voice': {
-                'provider': self.platform_config.get('voice', {}).get('provider', 'deepgram'),
+                'provider': voice_config.get('provider', 'deepgram'),
                 'voiceId': self.voice_id,
             },
             'maxDurationSeconds': (self.max_duration or 5) * 60,
-        })
-        
-        # Add any additional platform-specific config
-        if self.platform_config:
-            config.update(self.platform_config)
+            # Any additional platform-specific config overrides the above
+            **platform_config,
+        }
         
         return config
 
     def _get_elevenlabs_config(self, base_config):
         """Get ElevenLabs specific configuration"""
-        config = base_config.copy()
-        config.update({
+        platform_config = self.platform_config or _EMPTY
+        config = {
+            **base_config,
             'voice_id': self.voice_id,
             'voice_settings': {
                 'similarity_boost': self.temperature,
-                'stability': self.platform_config.get('voice_settings', {}).get('stability', 0.5),
+                'stability': platform_config.get('voice_settings', _EMPTY).get('stability', 0.5),
             },
-            'model_id': self.platform_config.get('model_id', 'eleven_monolingual_v1'),
-        })
-        
-        # Add any additional platform-specific config
-        if self.platform_config:
-            config.update(self.platform_config)
+            'model_id': platform_config.get('model_id', 'eleven_monolingual_v1'),
+            # Any additional platform-specific config overrides the above
+            **platform_config,
+        }
         
         return config
 
-class ChatConfig(models.Model):
+class ChatConfig(_EndpointConfigMixin, models.Model):
     content = models.TextField(blank=True, null=True)
     template = models.ForeignKey(MessageTemplate, on_delete=models.SET_NULL, null=True, blank=True, related_name='chat_configs')
     from_endpoint = models.ForeignKey(ContactEndpoint, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
-    platform = models.CharField(max_length=20, choices=[('whatsapp', 'WhatsApp'), ('messenger', 'Messenger'), ('telegram', 'Telegram')], blank=True, null=True)
-    priority = models.CharField(max_length=10, choices=[('high', 'High'), ('normal', 'Normal'), ('low', 'Low')], blank=True, null=True)
+    platform = models.CharField(max_length=20, choices=_CHAT_PLATFORM_CHOICES, blank=True, null=True)
+    priority = models.CharField(max_length=10, choices=_PRIORITY_CHOICES, blank=True, null=True)
     track_delivery = models.BooleanField(default=False)
     track_read = models.BooleanField(default=False)
     media_urls = models.JSONField(blank=True, null=True, help_text="List of media URLs")
     quick_replies = models.JSONField(blank=True, null=True, help_text="List of quick replies: [{text, value}]")
 
+    objects = _ConfigManager()
+
     class Meta:
         managed = False
         db_table = 'acs_chatconfig'
         
     def clean(self):
         super().clean()
-        if self.from_endpoint and 'social' not in self.from_endpoint.get_channel_list():
+        if self.from_endpoint and 'social' not in self.from_endpoint.get_channel_set():
             raise ValidationError("Selected endpoint must be a social media endpoint")
 
     def get_from_handle(self):
@@ -479,6 +479,16 @@ class ContactEndpoint(models.Model):
     def get_channel_list(self):
         return [c.channel for c in self.channels.all()]
 
+    def get_channel_set(self):
+        """
+        Channels of this endpoint as a frozenset, cached on the instance so
+        validating several configs against the same endpoint queries once.
+        """
+        channels = self.__dict__.get('_channel_set')
+        if channels is None:
+            channels = self._channel_set = frozenset(self.get_channel_list())
+        return channels
+
     def get_campaigns(self):
         """
         Get all campaigns this contact endpoint is assigned to.
@@ -1,3 +1,377 @@
-from django.test import TestCase
+import tempfile
+from contextlib import ExitStack
+from io import StringIO
+from unittest.mock import MagicMock, patch
 
-# Create your tests here.
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, models
+from django.test import SimpleTestCase, TestCase
+
+from external_models.management.commands.apply_model_definitions import Command as ApplyModelDefinitionsCommand
+from external_models.management.commands.sync_models import Command as SyncModelsCommand
+from external_models.models import (
+    ChatConfig,
+    EmailConfig,
+    LeadNurturingParticipant,
+    SMSConfig,
+    VoiceConfig,
+    accounts,
+    channel_configs,
+)
+from external_models.models.communications import ContactEndpoint, ContactEndpointChannel
+from external_models.models.external_references import ScheduledReachOut
+from external_models.models.reporting import BlandAICall
+
+
+class SyncModelsFetchColumnsTests(SimpleTestCase):
+    def _cursor(self, *results):
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = list(results)
+        cursor_cm = MagicMock()
+        cursor_cm.__enter__.return_value = cursor
+        return cursor, cursor_cm
+
+    def test_like_prefix_escapes_wildcards(self):
+        self.assertEqual(SyncModelsCommand._like_prefix('crm_a%'), 'crm\\_a\\%%')
+
+    def test_mysql_app_prefix_uses_show_columns(self):
+        cursor, cursor_cm = self._cursor(
+            [('crm_lead',)],
+            [('id', 'int unsigned', 'NO', 'PRI', None, 'auto_increment'),
+             ('name', 'varchar(255)', 'YES', '', 'x', '')],
+        )
+        with patch('external_models.management.commands.sync_models.connection') as connection:
+            connection.vendor = 'mysql'
+            connection.cursor.return_value = cursor_cm
+            connection.ops.quote_name.side_effect = lambda name: f'`{name}`'
+            columns = dict(SyncModelsCommand().iter_table_columns(app_prefix='crm'))
+
+        self.assertEqual(cursor.execute.call_args_list[0].args, ('SHOW TABLES LIKE %s', ['crm%']))
+        self.assertEqual(cursor.execute.call_args_list[1].args, ('SHOW COLUMNS FROM `crm_lead`',))
+        self.assertEqual(columns, {'crm_lead': [
+            {'name': 'id', 'type': 'int', 'nullable': False, 'default': None},
+            {'name': 'name', 'type': 'varchar', 'nullable': True, 'default': 'x'},
+        ]})
+
+    def test_mysql_model_is_resolved_before_show_columns(self):
+        for existing, expected in (([], {}), ([('crm_lead',)], {'crm_lead': []})):
+            cursor, cursor_cm = self._cursor(existing, [])
+            with self.subTest(existing=existing), \
+                    patch('external_models.management.commands.sync_models.connection') as connection:
+                connection.vendor = 'mysql'
+                connection.cursor.return_value = cursor_cm
+                connection.ops.quote_name.side_effect = lambda name: f'`{name}`'
+                columns = dict(SyncModelsCommand().iter_table_columns(table='crm_lead'))
+
+            self.assertEqual(cursor.execute.call_args_list[0].args, ('SHOW TABLES LIKE %s', ['crm\\_lead']))
+            self.assertEqual(cursor.execute.call_count, 1 + len(existing))
+            self.assertEqual(columns, expected)
+
+    def test_information_schema_rows_are_grouped_by_table(self):
+        cursor, cursor_cm = self._cursor()
+        cursor.__iter__.return_value = iter([
+            ('crm_lead', 'id', 'int', 'NO', None),
+            ('crm_lead', 'name', 'varchar', 'YES', None),
+            ('crm_note', 'id', 'int', 'NO', None),
+        ])
+        with patch('external_models.management.commands.sync_models.connection') as connection:
+            connection.vendor = 'sqlite'
+            connection.chunked_cursor.return_value = cursor_cm
+            tables = [(name, [c['name'] for c in columns])
+                      for name, columns in SyncModelsCommand().iter_table_columns(app_prefix='crm')]
+
+        self.assertIn('table_name LIKE %s', cursor.execute.call_args.args[0])
+        self.assertEqual(tables, [('crm_lead', ['id', 'name']), ('crm_note', ['id'])])
+
+    def test_model_outside_app_prefix_skips_query(self):
+        with patch('external_models.management.commands.sync_models.connection') as connection:
+            self.assertEqual(list(SyncModelsCommand().iter_table_columns('crm', 'accounts_user')), [])
+        connection.cursor.assert_not_called()
+
+
+class ApplyModelDefinitionsIndexTests(SimpleTestCase):
+    def test_model_index_resolves_installed_models(self):
+        model_index = ApplyModelDefinitionsCommand.build_model_index()
+        model = next(iter(apps.get_app_config('external_models').get_models()))
+        self.assertIs(model_index[model._meta.model_name], model)
+
+    def test_update_model_resolves_acronym_model_names(self):
+        model_index = ApplyModelDefinitionsCommand.build_model_index()
+        for table_name, model in (('bland_ai_call', BlandAICall), ('scheduled_reachout', ScheduledReachOut)):
+            with self.subTest(table_name=table_name):
+                command = ApplyModelDefinitionsCommand(stdout=StringIO())
+                command.update_model({'table_name': table_name, 'fields': []}, model_index)
+                self.assertIn('Successfully updated model', command.stdout._out.getvalue())
+                self.assertIs(model_index[table_name.replace('_', '')], model)
+
+    def test_update_field_warns_on_unknown_type(self):
+        command = ApplyModelDefinitionsCommand(stdout=StringIO())
+        field = models.CharField(name='title', max_length=10)
+        command.update_field(field, {'type': 'CharField', 'null': True})
+        command.update_field(field, {'type': 'NoSuchField'})
+        self.assertTrue(field.null)
+        self.assertIn('Unknown field type NoSuchField', command.stdout._out.getvalue())
+
+    def test_update_model_matches_columns_by_attname(self):
+        field = LeadNurturingParticipant._meta.get_field('lead')
+        command = ApplyModelDefinitionsCommand(stdout=StringIO())
+        with patch.object(command, 'update_field') as update_field:
+            command.update_model(
+                {'table_name': 'lead_nurturing_participant', 'fields': [{'name': 'lead_id'}, {'name': 'missing'}]},
+                {'leadnurturingparticipant': LeadNurturingParticipant},
+            )
+        update_field.assert_called_once_with(field, {'name': 'lead_id'})
+
+
+class TimezoneChoicesTests(SimpleTestCase):
+    def test_choices_come_from_the_tzdata_package(self):
+        zones = [tz for tz, _ in accounts._TZ_CHOICES]
+        self.assertEqual(zones, sorted(zones))
+        self.assertIn('UTC', zones)
+        self.assertIn('America/New_York', zones)
+        self.assertFalse({'Factory', 'localtime', 'posixrules'} & set(zones))
+
+
+class SyncModelsTypeMappingTests(SimpleTestCase):
+    def test_map_db_type_to_django(self):
+        command = SyncModelsCommand()
+        for db_type, expected in (('VARCHAR(255)', 'CharField'), ('bigint', 'BigIntegerField'),
+                                  ('decimal(10,2)', 'DecimalField'), ('geometry', 'CharField')):
+            with self.subTest(db_type=db_type):
+                self.assertEqual(command.map_db_type_to_django(db_type), expected)
+
+
+class ModelDefinitionBundleTests(SimpleTestCase):
+    def test_definitions_round_trip_through_each_format(self):
+        definitions = {
+            table: SyncModelsCommand().generate_model_definition(
+                table, [{'name': 'id', 'type': 'int', 'nullable': False, 'default': None}]
+            )
+            for table in ('crm_lead', 'crm_note')
+        }
+        for output_format in ('dir', 'jsonl', 'tar'):
+            with self.subTest(output_format=output_format), tempfile.TemporaryDirectory() as output_dir:
+                with ExitStack() as stack:
+                    write = SyncModelsCommand().open_definition_writer(stack, output_dir, output_format)
+                    for table, model_def in definitions.items():
+                        write(table, model_def)
+
+                reader = ApplyModelDefinitionsCommand()
+                read_back = sorted(reader.iter_model_definitions(output_dir), key=lambda d: d['table_name'])
+                self.assertEqual(read_back, list(definitions.values()))
+                self.assertEqual(
+                    list(reader.iter_model_definitions(output_dir, 'crm_note')), [definitions['crm_note']]
+                )
+
+    def test_bundle_wins_over_per_table_files(self):
+        fresh = SyncModelsCommand().generate_model_definition(
+            'crm_lead', [{'name': 'id', 'type': 'bigint', 'nullable': False, 'default': None}]
+        )
+        stale = {**fresh, 'fields': []}
+        with tempfile.TemporaryDirectory() as output_dir:
+            with ExitStack() as stack:
+                SyncModelsCommand().open_definition_writer(stack, output_dir, 'dir')('crm_lead', stale)
+                SyncModelsCommand().open_definition_writer(stack, output_dir, 'jsonl')('crm_lead', fresh)
+            reader = ApplyModelDefinitionsCommand(stdout=StringIO())
+            self.assertEqual(list(reader.iter_model_definitions(output_dir)), [fresh])
+            self.assertIn('ignoring 1 per-table .json files', reader.stdout._out.getvalue())
+
+            with ExitStack() as stack:
+                SyncModelsCommand().open_definition_writer(stack, output_dir, 'tar')('crm_lead', fresh)
+            self.assertEqual(list(reader.iter_model_definitions(output_dir)), [])
+            self.assertIn('Multiple definition bundles', reader.stdout._out.getvalue())
+
+
+class SyncModelsCacheTests(SimpleTestCase):
+    def test_unchanged_fingerprint_reuses_cached_columns(self):
+        columns = [('crm_lead', [{'name': 'id', 'type': 'int', 'nullable': False, 'default': None}])]
+        command = SyncModelsCommand()
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch.object(command, 'schema_fingerprint', return_value=(3, '2026-01-01')), \
+                patch.object(command, 'iter_table_columns', return_value=iter(columns)) as iter_columns:
+            first = list(command.cached_table_columns(cache_dir, 'crm'))
+            second = list(command.cached_table_columns(cache_dir, 'crm'))
+
+        iter_columns.assert_called_once_with('crm', None)
+        self.assertEqual(first, columns)
+        self.assertEqual(second, columns)
+
+    def test_cache_is_opt_in(self):
+        for args, cached in (([], False), (['--cache'], True)):
+            with self.subTest(args=args), tempfile.TemporaryDirectory() as output_dir, \
+                    patch.object(SyncModelsCommand, 'cached_table_columns', return_value=[]) as cached_columns, \
+                    patch.object(SyncModelsCommand, 'iter_table_columns', return_value=[]) as iter_columns:
+                call_command('sync_models', '--output', output_dir, *args, stdout=StringIO())
+            self.assertEqual(cached_columns.called, cached)
+            self.assertEqual(iter_columns.called, not cached)
+
+    def test_postgresql_fingerprint_covers_column_defaults(self):
+        with patch('external_models.management.commands.sync_models.connection') as connection:
+            connection.vendor = 'postgresql'
+            cursor = connection.cursor.return_value.__enter__.return_value
+            SyncModelsCommand().schema_fingerprint()
+
+        sql = cursor.execute.call_args.args[0]
+        for catalog in ('pg_class', 'pg_attribute', 'pg_attrdef'):
+            self.assertIn(f'FROM {catalog}', sql)
+
+
+class SqlDefaultTests(SimpleTestCase):
+    def test_sql_expression_defaults_are_not_copied(self):
+        columns = [
+            {'name': 'id', 'type': 'int', 'nullable': False, 'default': "nextval('lead_id_seq'::regclass)"},
+            {'name': 'created_at', 'type': 'datetime', 'nullable': False, 'default': 'CURRENT_TIMESTAMP'},
+            {'name': 'status', 'type': 'varchar', 'nullable': False, 'default': 'active'},
+        ]
+        model_def = SyncModelsCommand().generate_model_definition('crm_lead', columns)
+        self.assertEqual([f.get('default') for f in model_def['fields']], [None, None, 'active'])
+
+        field = models.CharField(name='status', max_length=10, default='new')
+        ApplyModelDefinitionsCommand().update_field(field, {'default': 'now()'})
+        self.assertEqual(field.default, 'new')
+
+
+class VoiceConfigPlatformTests(SimpleTestCase):
+    def test_platform_config_dispatches_on_platform(self):
+        for platform, key in (('bland_ai', 'task'), ('vapi', 'assistant'), ('elevenlabs', 'model_id')):
+            with self.subTest(platform=platform):
+                config = VoiceConfig(platform=platform, content='hi', platform_config={}).get_platform_config()
+                self.assertIn(key, config)
+        twilio = VoiceConfig(platform='twilio', content='hi').get_platform_config()
+        self.assertNotIn('task', twilio)
+        self.assertEqual(twilio['content'], 'hi')
+
+    def test_validate_platform_config_dispatches_on_platform(self):
+        VoiceConfig(platform='twilio', platform_config={'keywords': 'x'})._validate_platform_config()
+        with self.assertRaisesMessage(ValidationError, 'keywords must be a list'):
+            VoiceConfig(platform='bland_ai', platform_config={'keywords': 'x'})._validate_platform_config()
+        for background_track in (5, 'httpfoo', 'ftp://host/a.mp3'):
+            with self.subTest(background_track=background_track), \
+                    self.assertRaisesMessage(ValidationError, 'background_track must be a valid URL'):
+                VoiceConfig(platform='bland_ai', platform_config={'background_track': background_track}).clean()
+        VoiceConfig(platform='bland_ai', platform_config={'background_track': 'https://a/b.mp3'}).clean()
+        with self.assertRaisesMessage(ValidationError, 'Invalid VAPI assistant model'):
+            VoiceConfig(platform='vapi', platform_config={'assistant': {'model': 'x'}})._validate_platform_config()
+
+    def test_vapi_rejects_non_object_platform_config(self):
+        for platform_config in (['assistant'], 'assistant'):
+            config = VoiceConfig(platform='vapi', platform_config=platform_config)
+            with self.subTest(platform_config=platform_config):
+                with self.assertRaisesMessage(ValidationError, 'VAPI platform_config must be an object'):
+                    config.clean()
+                with self.assertRaisesMessage(ValidationError, 'VAPI platform_config must be an object'):
+                    config.get_platform_config()
+
+    def test_bland_ai_schema_reports_field_messages(self):
+        VoiceConfig(platform='bland_ai', platform_config={
+            'interruption_threshold': 100, 'temperature': 1, 'dynamic_data': [], 'background_track': None,
+        }).clean()
+        for key in ('interruption_threshold', 'pathway_version', 'max_duration'):
+            for value in (True, 100.0):
+                with self.subTest(key=key, value=value), \
+                        self.assertRaisesMessage(ValidationError, f'{key} must be an integer'):
+                    VoiceConfig(platform='bland_ai', platform_config={key: value}).clean()
+        with self.assertRaisesMessage(ValidationError, 'temperature must be a number'):
+            VoiceConfig(platform='bland_ai', platform_config={'temperature': '0.5'}).clean()
+        with self.assertRaisesMessage(ValidationError, 'must be object'):
+            VoiceConfig(platform='bland_ai', platform_config=['keywords']).clean()
+
+    def test_get_validator_compiles_each_schema_once(self):
+        schema = {'type': 'object', 'properties': {'n': {'type': 'integer'}}}
+        with patch.object(channel_configs, '_validator_cache', {}), \
+                patch.object(channel_configs.fastjsonschema, 'compile',
+                             wraps=channel_configs.fastjsonschema.compile) as compile_schema:
+            validate = channel_configs._get_validator(schema)
+            self.assertIs(channel_configs._get_validator(schema), validate)
+            self.assertIsNot(channel_configs._get_validator(dict(schema)), validate)
+        self.assertEqual(compile_schema.call_count, 2)
+        self.assertEqual(validate({'n': 1}), {'n': 1})
+
+    def test_platform_config_builders_accept_null_platform_config(self):
+        for platform in ('bland_ai', 'vapi', 'elevenlabs'):
+            with self.subTest(platform=platform):
+                VoiceConfig(platform=platform, voice_id='v', platform_config=None).get_platform_config()
+        elevenlabs = VoiceConfig(platform='elevenlabs', platform_config=None).get_platform_config()
+        self.assertEqual(elevenlabs['voice_settings']['stability'], 0.5)
+
+    def test_webhook_config_merged_only_for_non_bland_platforms(self):
+        webhook_config = {'url': 'https://hooks/a', 'events': ['completed'], 'secret': 's'}
+        bland = VoiceConfig(platform='bland_ai', webhook_config=webhook_config).get_platform_config()
+        self.assertEqual(bland['webhook'], 'https://hooks/a')
+        self.assertEqual(bland['webhook_events'], ['completed'])
+        self.assertFalse({'url', 'events', 'secret'} & bland.keys())
+        vapi = VoiceConfig(platform='vapi', webhook_config=webhook_config).get_platform_config()
+        self.assertEqual(vapi['url'], 'https://hooks/a')
+        self.assertEqual(vapi['secret'], 's')
+
+
+class ContactEndpointChannelSetTests(SimpleTestCase):
+    def test_channel_set_is_cached_per_instance(self):
+        endpoint = ContactEndpoint()
+        with patch.object(ContactEndpoint, 'get_channel_list', return_value=['sms']) as get_channel_list:
+            SMSConfig(from_endpoint=endpoint).clean()
+            SMSConfig(from_endpoint=endpoint).clean()
+            with self.assertRaisesMessage(ValidationError, 'must be a voice endpoint'):
+                VoiceConfig(from_endpoint=endpoint).clean()
+        get_channel_list.assert_called_once_with()
+
+
+class ChannelConfigManagerTests(SimpleTestCase):
+    def test_config_querysets_join_endpoint_and_template(self):
+        for model in (EmailConfig, SMSConfig, VoiceConfig, ChatConfig):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(
+                    model.objects.all().query.select_related, {'from_endpoint': {}, 'template': {}}
+                )
+
+
+class ChannelConfigBulkValidateTests(TestCase):
+    """bulk_validate against real (test-created) tables for the unmanaged models."""
+
+    @classmethod
+    def setUpClass(cls):
+        # SQLite needs every foreign key's target table, even for NULL columns
+        cls.models = []
+        pending = [ContactEndpointChannel, SMSConfig]
+        while pending:
+            model = pending.pop()
+            if model not in cls.models:
+                cls.models.append(model)
+                pending.extend(f.related_model for f in model._meta.concrete_fields if f.is_relation)
+        # SQLite can't alter the schema inside TestCase's class-wide atomic block
+        with connection.schema_editor() as editor:
+            for model in cls.models:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in reversed(cls.models):
+                editor.delete_model(model)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sms_endpoint = ContactEndpoint.objects.create(value='+15550000001')
+        cls.email_endpoint = ContactEndpoint.objects.create(value='a@example.com')
+        ContactEndpointChannel.objects.create(endpoint=cls.sms_endpoint, channel='sms')
+        ContactEndpointChannel.objects.create(endpoint=cls.email_endpoint, channel='email')
+
+    def test_manager_loaded_configs_share_one_channels_query(self):
+        SMSConfig.objects.bulk_create(
+            [SMSConfig(from_endpoint=self.sms_endpoint), SMSConfig(from_endpoint=self.sms_endpoint), SMSConfig()]
+        )
+        configs = list(SMSConfig.objects.all())
+
+        with self.assertNumQueries(1):
+            SMSConfig.bulk_validate(configs)
+        self.assertIs(configs[0].from_endpoint, configs[1].from_endpoint)
+
+    def test_unloaded_endpoints_are_fetched_with_their_channels(self):
+        configs = [SMSConfig(from_endpoint_id=self.sms_endpoint.pk), SMSConfig(from_endpoint_id=self.email_endpoint.pk)]
+
+        with self.assertNumQueries(2), self.assertRaisesMessage(ValidationError, 'must be an SMS endpoint'):
+            SMSConfig.bulk_validate(configs)